@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from api.mongo import register_mongo_connection
+        from api import checks  # noqa: F401  registers the system checks
+
+        register_mongo_connection()
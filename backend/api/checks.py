@@ -0,0 +1,19 @@
+from django.core.checks import Warning, register
+from api import response_cache
+
+
+@register()
+def check_dog_list_cache(app_configs, **kwargs):
+    config = response_cache.get_cache_settings()
+    if config["ENABLED"] and not config["ALLOW_PROCESS_LOCAL"] and not response_cache.has_shared_version_store():
+        return [
+            Warning(
+                "DOG_LIST_CACHE is enabled but CACHES['default'] is process-local, so the dog list cache is off.",
+                hint=(
+                    "Configure a shared cache backend (e.g. Redis) so version bumps reach every worker, "
+                    "or set DOG_LIST_CACHE['ALLOW_PROCESS_LOCAL'] for a single-process server."
+                ),
+                id="api.W001",
+            )
+        ]
+    return []
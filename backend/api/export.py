@@ -0,0 +1,206 @@
+# api/export.py
+#
+# Streaming export of the dogs collection. Documents are read straight from a
+# batched pymongo cursor with a projection, so only one batch is held in memory
+# at a time no matter how large the export is.
+
+import csv
+from api.models import Dog, Breed, RescueType
+
+# Same column layout as aac_shelter_outcomes.csv
+EXPORT_COLUMNS = [
+    "no",
+    "age_upon_outcome",
+    "animal_id",
+    "animal_type",
+    "breed",
+    "color",
+    "date_of_birth",
+    "datetime",
+    "monthyear",
+    "name",
+    "outcome_subtype",
+    "outcome_type",
+    "sex_upon_outcome",
+    "location_lat",
+    "location_long",
+    "age_upon_outcome_in_weeks",
+    "rescue_type",
+]
+
+EXPORT_FORMATS = ["csv", "parquet", "arrow"]
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Filter name -> document field for plain string filters
+STRING_FILTERS = {
+    "animal_type": "animal_type",
+    "outcome_type": "outcome_type",
+    "color": "color",
+    "sex": "sex_upon_outcome",
+    "status": "status",
+}
+
+# Every filter build_query() understands
+FILTER_PARAMS = ["breed", "rescue_type", *STRING_FILTERS]
+
+
+def build_query(filters):
+    """Turn export filters (breed, rescue_type, outcome_type, ...) into a Mongo query."""
+    query = {}
+    for key, field in STRING_FILTERS.items():
+        value = filters.get(key)
+        if value:
+            query[field] = value
+
+    # Breed and rescue type are references, so filter on the referenced id
+    breed_name = filters.get("breed")
+    if breed_name:
+        breed_ids = [b.id for b in Breed.objects(name=breed_name).only("id")]
+        query["breed"] = {"$in": breed_ids}
+
+    rescue_name = filters.get("rescue_type")
+    if rescue_name:
+        rescue_ids = [rt.id for rt in RescueType.objects(name=rescue_name).only("id")]
+        query["rescue_type"] = {"$in": rescue_ids}
+
+    return query
+
+
+def iter_dog_rows(filters=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield one dict per dog, keyed by EXPORT_COLUMNS, from a batched cursor."""
+    query = build_query(filters or {})
+    projection = {column: 1 for column in EXPORT_COLUMNS}
+    projection["_id"] = 0
+
+    # Breeds and rescue types are small lookup tables, resolve names once
+    breed_names = {b["_id"]: b["name"] for b in Breed._get_collection().find({}, {"name": 1})}
+    rescue_names = {r["_id"]: r["name"] for r in RescueType._get_collection().find({}, {"name": 1})}
+
+    cursor = Dog._get_collection().find(query, projection, batch_size=batch_size)
+    try:
+        for doc in cursor:
+            row = {column: doc.get(column) for column in EXPORT_COLUMNS}
+            row["breed"] = breed_names.get(row["breed"])
+            row["rescue_type"] = rescue_names.get(row["rescue_type"])
+            yield row
+    finally:
+        cursor.close()
+
+
+def iter_batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Echo:
+    """File-like object whose write() just hands the value back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Yield CSV text chunks (header first) for the given rows."""
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_COLUMNS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow({k: "" if v is None else v for k, v in row.items()})
+
+
+class _ChunkSink:
+    """Write-only file object that buffers bytes until drain() is called."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for parquet/arrow export (pip install pyarrow)")
+    return pa, pq
+
+
+def _arrow_schema(pa):
+    float_columns = {"location_lat", "location_long", "age_upon_outcome_in_weeks"}
+    fields = []
+    for column in EXPORT_COLUMNS:
+        if column == "no":
+            fields.append(pa.field(column, pa.int64()))
+        elif column in float_columns:
+            fields.append(pa.field(column, pa.float64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def stream_columnar(rows, export_format="parquet", batch_size=DEFAULT_BATCH_SIZE):
+    """Yield Parquet or Arrow IPC bytes, writing one row group / record batch per batch.
+
+    Requires pyarrow, which is an optional dependency.
+    """
+    pa, pq = _require_pyarrow()
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for batch in iter_batches(rows, batch_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def stream_export(export_format="csv", filters=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Return an iterator of output chunks (str for csv, bytes otherwise)."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    if export_format != "csv":
+        # Fail before the response starts streaming rather than halfway through
+        _require_pyarrow()
+
+    rows = iter_dog_rows(filters, batch_size=batch_size)
+    if export_format == "csv":
+        return stream_csv(rows)
+    return stream_columnar(rows, export_format, batch_size=batch_size)
@@ -0,0 +1,226 @@
+# api/index_advisor.py
+#
+# Records the queries the API actually sends to MongoDB, runs explain() on
+# each query shape and inspects $indexStats, so index changes can be based on
+# real access patterns. Used by `manage.py index_advisor` and api/tests.py.
+
+import json
+from urllib.parse import urlencode
+import mongoengine
+from pymongo import monitoring
+from django.test import Client, override_settings
+from api.models import Dog, Breed, RescueType
+from api.mongo import register_mongo_connection
+
+MODELS = [Dog, Breed, RescueType]
+
+# Plan stages that mean the query was answered without walking an index
+SCAN_STAGES = {"COLLSCAN"}
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Collects the filter of every find/count sent while `recording` is True."""
+
+    def __init__(self):
+        self.recording = False
+        self.queries = []
+
+    def started(self, event):
+        if not self.recording:
+            return
+        command = event.command
+        if event.command_name == "find":
+            self.queries.append((command["find"], command.get("filter", {}), command.get("sort")))
+        elif event.command_name == "count":
+            self.queries.append((command["count"], command.get("query", {}), None))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def connect(db_name, recorder=None, **kwargs):
+    """Point the default MongoEngine connection at `db_name`, optionally recording queries."""
+    mongoengine.disconnect()
+    if recorder is not None:
+        kwargs["event_listeners"] = [recorder]
+    register_mongo_connection(db=db_name, **kwargs)
+    return mongoengine.get_db()
+
+
+def query_shape(value):
+    """Replace the values in a filter with 1, keeping field names and operators.
+
+    {"breed": {"$in": [ObjectId(...)]}, "color": "Black"} -> {"breed": {"$in": 1}, "color": 1}
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    return 1
+
+
+def shape_key(collection, filter, sort=None):
+    return json.dumps([collection, query_shape(filter), sort], sort_keys=True, default=str)
+
+
+def sample_endpoint_paths():
+    """API paths exercising each query the frontend and export can send, using values from the data."""
+    dog = Dog._get_collection().find_one({}, {"animal_id": 1, "color": 1, "sex_upon_outcome": 1, "outcome_type": 1,
+                                              "animal_type": 1, "breed": 1, "rescue_type": 1})
+    if dog is None:
+        return []
+
+    breed = Breed._get_collection().find_one({"_id": dog["breed"]})
+    rescue = RescueType._get_collection().find_one({"_id": dog["rescue_type"]})
+    filters = [
+        {"breed": breed["name"]},
+        {"rescue_type": rescue["name"]},
+        {"color": dog["color"]},
+        {"sex": dog["sex_upon_outcome"]},
+        {"outcome_type": dog["outcome_type"]},
+        {"animal_type": dog["animal_type"], "outcome_type": dog["outcome_type"]},
+        {"breed": breed["name"], "animal_type": dog["animal_type"]},
+    ]
+    paths = [f"/api/dogs/{dog['animal_id']}/"]
+    paths += [f"/api/dogs/?{urlencode(params)}" for params in filters]
+    paths += [f"/api/dogs/export/?{urlencode(params)}" for params in filters[:3]]
+    return paths
+
+
+def record_endpoint_queries(recorder, paths):
+    """Request each path through the Django test client and return the distinct queries sent.
+
+    Returns {shape_key: {"collection", "filter", "sort", "paths", "count"}}.
+    """
+    client = Client()
+    shapes = {}
+    # Cached responses would hide the queries behind them
+    with override_settings(DOG_LIST_CACHE={"ENABLED": False}, ALLOWED_HOSTS=["testserver"]):
+        for path in paths:
+            recorder.queries = []
+            recorder.recording = True
+            try:
+                response = client.get(path, HTTP_ACCEPT="application/json")
+                if hasattr(response, "streaming_content"):
+                    for _ in response.streaming_content:
+                        pass
+            finally:
+                recorder.recording = False
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+            for collection, filter, sort in recorder.queries:
+                key = shape_key(collection, filter, sort)
+                entry = shapes.setdefault(key, {
+                    "collection": collection,
+                    "filter": filter,
+                    "sort": sort,
+                    "paths": [],
+                    "count": 0,
+                })
+                entry["count"] += 1
+                if path not in entry["paths"]:
+                    entry["paths"].append(path)
+    return shapes
+
+
+def _plan_stages(plan):
+    """Yield (stage, indexName) for every stage in an explain() winning plan."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"], plan.get("indexName")
+    # Newer servers nest the classic plan under "queryPlan" (slot-based engine)
+    for key in ("queryPlan", "inputStage"):
+        yield from _plan_stages(plan.get(key))
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def explain_query(db, collection, filter, sort=None):
+    """Return {"stages", "indexes", "collscan"} for the winning plan of a find."""
+    cursor = db[collection].find(filter)
+    if sort:
+        cursor = cursor.sort(list(sort.items()))
+    plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    stages = list(_plan_stages(plan))
+    return {
+        "stages": [stage for stage, _ in stages],
+        "indexes": sorted({index for _, index in stages if index}),
+        "collscan": any(stage in SCAN_STAGES for stage, _ in stages),
+    }
+
+
+def index_usage(db, collection):
+    """Return {index name: ops since server start} from $indexStats."""
+    return {
+        stat["name"]: stat["accesses"]["ops"]
+        for stat in db[collection].aggregate([{"$indexStats": {}}])
+    }
+
+
+def redundant_indexes(index_information):
+    """(name, covering index) for non-unique indexes whose keys prefix another index's keys."""
+    keys = {name: [field for field, _ in info["key"]] for name, info in index_information.items()}
+    redundant = []
+    for name, fields in keys.items():
+        if name == "_id_" or index_information[name].get("unique"):
+            continue
+        for other, other_fields in keys.items():
+            if other != name and len(other_fields) > len(fields) and other_fields[:len(fields)] == fields:
+                redundant.append((name, other))
+                break
+    return redundant
+
+
+def suggest_index(filter):
+    """Index key for a collection-scanning filter: its top-level fields, in query order."""
+    return [(field, 1) for field in filter if not field.startswith("$")]
+
+
+def analyze(db, shapes):
+    """Explain every recorded shape and build the report the command prints."""
+    report = {"queries": [], "collections": {}, "proposals": []}
+    proposed = set()
+
+    for entry in shapes.values():
+        if not entry["filter"]:
+            # Unfiltered reads (the full dog list) scan by design
+            continue
+        plan = explain_query(db, entry["collection"], entry["filter"], entry["sort"])
+        report["queries"].append({**entry, "plan": plan})
+        if plan["collscan"]:
+            key = suggest_index(entry["filter"])
+            name = "_".join(f"{field}_{direction}" for field, direction in key)
+            if (entry["collection"], name) not in proposed:
+                proposed.add((entry["collection"], name))
+                report["proposals"].append(
+                    f"create index {key} on {entry['collection']} (collection scan for {entry['paths'][0]})"
+                )
+
+    used = {(q["collection"], index) for q in report["queries"] for index in q["plan"]["indexes"]}
+    for model in MODELS:
+        collection = model._get_collection_name()
+        info = db[collection].index_information()
+        usage = index_usage(db, collection)
+        comparison = model.compare_indexes()
+        report["collections"][collection] = {"indexes": info, "usage": usage}
+
+        redundant = redundant_indexes(info)
+        for name, covered_by in redundant:
+            report["proposals"].append(f"drop {collection}.{name} (prefix of {covered_by})")
+        redundant_names = {name for name, _ in redundant}
+        for name in info:
+            if name == "_id_" or info[name].get("unique") or name in redundant_names:
+                continue
+            if (collection, name) in used:
+                continue
+            if usage.get(name, 0) == 0:
+                report["proposals"].append(f"drop {collection}.{name} (not used by any recorded query, 0 ops in $indexStats)")
+        for key in comparison["missing"]:
+            report["proposals"].append(f"run ensure_indexes: {collection} is missing declared index {key}")
+        for key in comparison["extra"]:
+            report["proposals"].append(f"{collection} has index {key} that is not declared in the model meta")
+
+    return report
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.models import Dog, Breed, RescueType
+
+
+class Command(BaseCommand):
+    help = "Create the MongoDB indexes declared in the Dog, Breed and RescueType meta"
+
+    def handle(self, *args, **options):
+        for model in (Dog, Breed, RescueType):
+            model.ensure_indexes()
+            indexes = model._get_collection().index_information()
+            self.stdout.write(f"{model._get_collection_name()}: {', '.join(sorted(indexes))}")
+        self.stdout.write(self.style.SUCCESS("Indexes are up to date"))
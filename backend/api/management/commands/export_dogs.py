@@ -0,0 +1,47 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from api.export import EXPORT_FORMATS, DEFAULT_BATCH_SIZE, FILTER_PARAMS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream dogs to CSV (aac_shelter_outcomes.csv layout), Parquet or Arrow"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", dest="export_format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", "-o", default="-", help="Output file path, '-' for stdout")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--breed")
+        parser.add_argument("--rescue-type")
+        parser.add_argument("--animal-type")
+        parser.add_argument("--outcome-type")
+        parser.add_argument("--color")
+        parser.add_argument("--sex")
+        parser.add_argument("--status")
+
+    def handle(self, *args, **options):
+        export_format = options["export_format"]
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        filters = {key: options[key] for key in FILTER_PARAMS if options[key]}
+
+        try:
+            chunks = stream_export(export_format, filters, batch_size=options["batch_size"])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        binary = export_format != "csv"
+        if options["output"] == "-":
+            out = sys.stdout.buffer if binary else sys.stdout
+            self._write(chunks, out)
+        else:
+            mode = "wb" if binary else "w"
+            encoding = None if binary else "utf-8"
+            with open(options["output"], mode, encoding=encoding, newline=None if binary else "") as out:
+                self._write(chunks, out)
+            self.stderr.write(f"Exported dogs to {options['output']}")
+
+    def _write(self, chunks, out):
+        for chunk in chunks:
+            out.write(chunk)
+        out.flush()
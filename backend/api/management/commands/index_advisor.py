@@ -0,0 +1,72 @@
+import mongoengine
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api import index_advisor
+from api.mongo import register_mongo_connection
+from api.seed import seed_dogs
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the API's dog queries against a seeded database, explain() each query shape, "
+        "and report collection scans, unused or redundant indexes and proposed index changes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--db",
+            help="Scratch database to seed and analyze (default: <MONGO_DB>_index_advisor). It is dropped first.",
+        )
+        parser.add_argument("--rows", type=int, default=2000, help="Number of dogs to seed from the CSV")
+        parser.add_argument("--live", action="store_true", help="Analyze the configured database without seeding")
+        parser.add_argument("--keep", action="store_true", help="Don't drop the scratch database afterwards")
+
+    def handle(self, *args, **options):
+        live = options["live"]
+        db_name = settings.MONGO_DB if live else (options["db"] or f"{settings.MONGO_DB}_index_advisor")
+        if not live and db_name == settings.MONGO_DB:
+            raise CommandError("Refusing to drop the configured database, use --live to analyze it in place")
+
+        recorder = index_advisor.QueryRecorder()
+        db = index_advisor.connect(db_name, recorder)
+        try:
+            if not live:
+                db.client.drop_database(db_name)
+                for model in index_advisor.MODELS:
+                    model.ensure_indexes()
+                seeded = seed_dogs(limit=options["rows"])
+                self.stdout.write(f"Seeded {seeded} dogs into {db_name}")
+
+            paths = index_advisor.sample_endpoint_paths()
+            if not paths:
+                raise CommandError(f"No dogs in {db_name} to build sample queries from")
+            shapes = index_advisor.record_endpoint_queries(recorder, paths)
+            report = index_advisor.analyze(db, shapes)
+            self.print_report(report)
+        finally:
+            if not live and not options["keep"]:
+                db.client.drop_database(db_name)
+            mongoengine.disconnect()
+            register_mongo_connection()
+
+    def print_report(self, report):
+        self.stdout.write("\nQuery shapes")
+        for query in report["queries"]:
+            shape = index_advisor.query_shape(query["filter"])
+            plan = query["plan"]
+            line = f"  {query['collection']} {shape} x{query['count']}: {' <- '.join(plan['stages'])}"
+            if plan["collscan"]:
+                self.stdout.write(self.style.WARNING(line + "  [COLLECTION SCAN]"))
+            else:
+                self.stdout.write(f"{line}  [{', '.join(plan['indexes'])}]")
+
+        self.stdout.write("\nIndex usage ($indexStats ops)")
+        for collection, info in report["collections"].items():
+            usage = ", ".join(f"{name}={ops}" for name, ops in sorted(info["usage"].items()))
+            self.stdout.write(f"  {collection}: {usage}")
+
+        self.stdout.write("\nProposals")
+        if not report["proposals"]:
+            self.stdout.write(self.style.SUCCESS("  None, every recorded query uses an index"))
+        for proposal in report["proposals"]:
+            self.stdout.write(f"  - {proposal}")
@@ -25,12 +25,16 @@ class Dog(Document):
     
     meta = {
         'collection': 'dogs',
+        # Indexes are created by `manage.py ensure_indexes`, not on first query
+        'auto_create_index': False,
         'indexes': [
             'animal_id',
             'name',
-            'breed',
-            'animal_type',
             'outcome_type',
+            'color',
+            'sex_upon_outcome',
+            'rescue_type',
+            # Also serve breed-only and animal_type-only filters (prefix match)
             ('breed', 'animal_type'),
             ('animal_type', 'outcome_type'),
         ]
@@ -44,6 +48,7 @@ class Breed(Document):
     
     meta = {
         'collection': 'breeds',
+        'auto_create_index': False,
         'indexes': [
             'name',
         ]
@@ -57,6 +62,7 @@ class RescueType(Document):
     
     meta = {
         'collection': 'rescues',
+        'auto_create_index': False,
         'indexes': [
             'name',
         ]
@@ -1,4 +1,5 @@
 import os
+import mongoengine
 from pymongo import MongoClient
 from dotenv import load_dotenv
 
@@ -15,3 +16,26 @@ def get_collection(name):
     print(f"Connecting to mongodb://{host}:{port}, DB: {db_name}, Collection: {name}")
     db = client[db_name]
     return db[name]
+
+
+def register_mongo_connection(db=None, **kwargs):
+    """Register the default MongoEngine connection without opening it.
+
+    The client is only created (and the server contacted) on the first query,
+    so manage.py commands and test runs that never touch Mongo don't pay for it.
+    `db` overrides settings.MONGO_DB and extra kwargs are passed to MongoClient.
+    """
+    from django.conf import settings
+
+    if settings.MONGO_USERNAME and settings.MONGO_PASSWORD:
+        host = f"mongodb://{settings.MONGO_USERNAME}:{settings.MONGO_PASSWORD}@{settings.MONGO_HOST}:{settings.MONGO_PORT}/?authSource=AAC"
+    else:
+        host = f"mongodb://{settings.MONGO_HOST}:{settings.MONGO_PORT}"
+
+    mongoengine.register_connection(
+        alias=mongoengine.DEFAULT_CONNECTION_NAME,
+        db=db or settings.MONGO_DB,
+        host=host,
+        connect=False,
+        **kwargs,
+    )
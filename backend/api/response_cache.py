@@ -0,0 +1,210 @@
+# api/response_cache.py
+#
+# Response-level cache for hot list endpoints. Rendered JSON bytes (and
+# optionally gzip/brotli pre-compressed copies) are stored in a size-bounded
+# in-process LRU, keyed by the endpoint, the normalized query parameters and
+# the current version of every collection the response depends on.
+#
+# Write handlers call bump_version() for the collection they change. Versions
+# live in Django's cache framework, so with a shared backend (e.g. Redis) a
+# write in one worker invalidates the cached responses of all workers. With a
+# per-process backend (the default LocMemCache) other workers would never see
+# the bump, so the cache stays off unless ALLOW_PROCESS_LOCAL is set for a
+# single-process deployment.
+
+import gzip
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_SETTINGS = {
+    "ENABLED": False,
+    "MAX_BYTES": 64 * 1024 * 1024,
+    "MAX_ENTRIES": 256,
+    "COMPRESSION": ["gzip", "br"],
+    "ALLOW_PROCESS_LOCAL": False,
+}
+
+# Cache backends whose data isn't visible to other worker processes
+PROCESS_LOCAL_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def get_cache_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "DOG_LIST_CACHE", {})}
+
+
+def has_shared_version_store():
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend not in PROCESS_LOCAL_BACKENDS
+
+
+def is_enabled():
+    """True when the cache is switched on and its version bumps reach every worker."""
+    config = get_cache_settings()
+    return config["ENABLED"] and (config["ALLOW_PROCESS_LOCAL"] or has_shared_version_store())
+
+
+def _version_key(collection):
+    return f"collection-version:{collection}"
+
+
+def get_version(collection):
+    return cache.get_or_set(_version_key(collection), 1, timeout=None)
+
+
+def bump_version(collection):
+    """Invalidate every cached response that depends on `collection`."""
+    try:
+        cache.incr(_version_key(collection))
+    except ValueError:
+        # Key was missing or evicted, start a new version sequence
+        cache.set(_version_key(collection), 2, timeout=None)
+
+
+def normalize_params(query_params, names):
+    """Return the filters in `names` as a hashable, order-independent tuple.
+
+    Each filter takes the same value QueryDict.get() gives (the last one), and
+    empty values are dropped, so ?breed=Lab&color=Black and
+    ?color=Black&breed=Lab&sex= give the same key. dict() of the result is the
+    filter dict the response is built from, so a key can't stand for a
+    different query. Params the endpoint doesn't use are dropped.
+    """
+    return tuple((key, query_params.get(key)) for key in sorted(names) if query_params.get(key))
+
+
+def compress(body, encodings):
+    encoded = {"identity": body}
+    if "gzip" in encodings:
+        encoded["gzip"] = gzip.compress(body, compresslevel=6)
+    if "br" in encodings and brotli is not None:
+        encoded["br"] = brotli.compress(body)
+    return encoded
+
+
+def _parse_accept_encoding(accept_encoding):
+    """{coding: qvalue} from an Accept-Encoding header. A malformed q counts as 0."""
+    qvalues = {}
+    for part in accept_encoding.lower().split(","):
+        coding, *params = [item.strip() for item in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    return qvalues
+
+
+def choose_encoding(accept_encoding, available):
+    """Pick br, then gzip, if the client accepts it with q > 0; otherwise identity."""
+    qvalues = _parse_accept_encoding(accept_encoding)
+    for encoding in ("br", "gzip"):
+        if encoding in available and qvalues.get(encoding, qvalues.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded response bodies with singleflight rebuilds."""
+
+    def __init__(self, max_bytes, max_entries):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.size = 0
+        self.flights = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        """Return the cached entry for `key`, calling build() at most once per miss.
+
+        Concurrent callers that miss on the same key wait for the first
+        caller's build instead of each rebuilding the response.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            entry = build()
+            flight.result = entry
+            self._store(key, entry)
+            return entry
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.flights.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key, entry):
+        entry_size = sum(len(body) for body in entry.values())
+        if entry_size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= sum(len(body) for body in old.values())
+            self.entries[key] = entry
+            self.size += entry_size
+            while self.entries and (self.size > self.max_bytes or len(self.entries) > self.max_entries):
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= sum(len(body) for body in evicted.values())
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_cache_settings()
+                _cache = ResponseCache(config["MAX_BYTES"], config["MAX_ENTRIES"])
+    return _cache
@@ -0,0 +1,101 @@
+# api/seed.py
+#
+# Bulk seeding of the dogs collection from aac_shelter_outcomes.csv, for
+# scratch databases used by the index advisor and benchmarks. load_data.py is
+# still the way to load the real database.
+
+import csv
+from django.conf import settings
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from api.models import Dog, Breed, RescueType
+
+CSV_PATH = settings.BASE_DIR.parent / "aac_shelter_outcomes.csv"
+
+
+def iter_csv_dogs(csv_path=CSV_PATH):
+    with open(csv_path, "r", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            if row["animal_type"] == "Dog":
+                yield row
+
+
+def _float_or_none(value):
+    return float(value) if value else None
+
+
+def _get_or_create_id(model, name, cache):
+    if name not in cache:
+        doc = model._get_collection().find_one_and_update(
+            {"name": name},
+            {"$setOnInsert": {"name": name}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        cache[name] = doc["_id"]
+    return cache[name]
+
+
+def dog_document(row, breed_id, rescue_id):
+    """Raw Mongo document for a CSV row, in the shape Dog.save() would write."""
+    return {
+        "no": int(row["no"]),
+        "age_upon_outcome": row["age_upon_outcome"],
+        "animal_id": row["animal_id"],
+        "animal_type": row["animal_type"],
+        "breed": breed_id,
+        "color": row["color"],
+        "date_of_birth": row["date_of_birth"],
+        "datetime": row["datetime"],
+        "monthyear": row["monthyear"],
+        "name": row["name"] or "",
+        "outcome_subtype": row["outcome_subtype"],
+        "outcome_type": row["outcome_type"],
+        "sex_upon_outcome": row["sex_upon_outcome"],
+        "location_lat": _float_or_none(row["location_lat"]),
+        "location_long": _float_or_none(row["location_long"]),
+        "age_upon_outcome_in_weeks": _float_or_none(row["age_upon_outcome_in_weeks"]),
+        "rescue_type": rescue_id,
+        "description": f"{row['breed']} - {row['color']}",
+        "status": "available",
+    }
+
+
+def seed_dogs(limit=None, csv_path=CSV_PATH, batch_size=1000, scale=1):
+    """Bulk-insert dogs from the CSV into the current database. Returns the number inserted.
+
+    With scale > 1 the CSV is repeated `scale` times to build a larger
+    synthetic dataset; copies get a "-<n>" suffix on animal_id to stay unique.
+    """
+    breed_ids = {}
+    rescue_ids = {}
+    collection = Dog._get_collection()
+    inserted = 0
+    batch = []
+
+    for copy in range(scale):
+        for row in iter_csv_dogs(csv_path):
+            if limit is not None and inserted + len(batch) >= limit:
+                break
+            breed_id = _get_or_create_id(Breed, row["breed"], breed_ids)
+            rescue_id = _get_or_create_id(RescueType, row["rescue_type"], rescue_ids)
+            document = dog_document(row, breed_id, rescue_id)
+            if copy:
+                document["animal_id"] = f"{row['animal_id']}-{copy}"
+            batch.append(document)
+            if len(batch) >= batch_size:
+                inserted += _insert_batch(collection, batch)
+                batch = []
+
+    if batch:
+        inserted += _insert_batch(collection, batch)
+    return inserted
+
+
+def _insert_batch(collection, batch):
+    # The CSV has a few animals with more than one outcome row; the unique
+    # animal_id index keeps the first and the rest of the batch still goes in
+    try:
+        return len(collection.insert_many(batch, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        return e.details["nInserted"]
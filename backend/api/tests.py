@@ -1,3 +1,630 @@
+import csv
+import io
+import threading
+import time
+import unittest
+from collections import defaultdict
+import mongoengine
+from bson import ObjectId
+from django.conf import settings
+from django.http import QueryDict
+from django.test import SimpleTestCase, override_settings
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from api import checks, export, index_advisor, response_cache, write_queue
+from api.models import Breed, RescueType
+from api.mongo import register_mongo_connection
+from api.seed import CSV_PATH, iter_csv_dogs, seed_dogs
+from api.views.dogs_views import update_fields
+from benchmarks.load_test import percentile
 
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
 
-# Create your tests here.
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+class DogQueryIndexTests(SimpleTestCase):
+    """Every query the dog endpoints send must be answered from an index.
+
+    Needs a running MongoDB (the MONGO_* settings); skipped otherwise.
+    """
+
+    db_name = f"{settings.MONGO_DB}_test_indexes"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.recorder = index_advisor.QueryRecorder()
+        cls.db = index_advisor.connect(cls.db_name, cls.recorder, serverSelectionTimeoutMS=2000)
+        try:
+            cls.db.client.drop_database(cls.db_name)
+        except PyMongoError as e:
+            cls._restore_connection()
+            raise unittest.SkipTest(f"MongoDB is not available: {e}")
+        for model in index_advisor.MODELS:
+            model.ensure_indexes()
+        seed_dogs(limit=500)
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            cls.db.client.drop_database(cls.db_name)
+        finally:
+            cls._restore_connection()
+            super().tearDownClass()
+
+    @classmethod
+    def _restore_connection(cls):
+        mongoengine.disconnect()
+        register_mongo_connection()
+
+    def test_endpoint_queries_use_indexes(self):
+        shapes = index_advisor.record_endpoint_queries(self.recorder, index_advisor.sample_endpoint_paths())
+        self.assertTrue(shapes)
+
+        for entry in shapes.values():
+            if not entry["filter"]:
+                continue
+            plan = index_advisor.explain_query(self.db, entry["collection"], entry["filter"], entry["sort"])
+            with self.subTest(collection=entry["collection"], shape=index_advisor.query_shape(entry["filter"])):
+                self.assertFalse(
+                    plan["collscan"],
+                    f"{entry['paths'][0]} scans {entry['collection']}: {' <- '.join(plan['stages'])}",
+                )
+
+    def test_no_redundant_dog_indexes(self):
+        info = self.db["dogs"].index_information()
+        self.assertEqual(index_advisor.redundant_indexes(info), [])
+
+
+# explain() output of a 7.x server (slot-based engine) for an indexed query
+INDEXED_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "queryPlan": {
+                "stage": "FETCH",
+                "inputStage": {
+                    "stage": "OR",
+                    "inputStages": [
+                        {"stage": "IXSCAN", "indexName": "breed_1_animal_type_1"},
+                        {"stage": "IXSCAN", "indexName": "color_1"},
+                    ],
+                },
+            },
+            "slotBasedPlan": {"slots": "..."},
+        },
+    },
+}
+
+# explain() output of a classic-engine server for an unindexed, sorted query
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "SORT",
+            "inputStage": {"stage": "COLLSCAN", "direction": "forward"},
+        },
+    },
+}
+
+
+class _ExplainCursor:
+    def __init__(self, explain):
+        self._explain = explain
+        self.sorted_by = None
+
+    def sort(self, keys):
+        self.sorted_by = keys
+        return self
+
+    def explain(self):
+        return self._explain
+
+
+class _ExplainDatabase:
+    """Stands in for a pymongo Database whose collections return a canned explain()."""
+
+    def __init__(self, explain):
+        self.cursor = _ExplainCursor(explain)
+
+    def __getitem__(self, collection):
+        return self
+
+    def find(self, filter):
+        self.filter = filter
+        return self.cursor
+
+
+class IndexAdvisorTests(SimpleTestCase):
+    def test_query_shape_keeps_fields_and_operators(self):
+        filter = {"breed": {"$in": [ObjectId(), ObjectId()]}, "color": "Black", "$or": [{"a": 1}]}
+        self.assertEqual(index_advisor.query_shape(filter), {"breed": {"$in": 1}, "color": 1, "$or": 1})
+
+    def test_shape_key_ignores_values(self):
+        a = index_advisor.shape_key("dogs", {"color": "Black", "name": "Rex"})
+        b = index_advisor.shape_key("dogs", {"name": "Max", "color": "White"})
+        c = index_advisor.shape_key("dogs", {"color": "Black"})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_plan_stages_walks_nested_plans(self):
+        stages = list(index_advisor._plan_stages(INDEXED_EXPLAIN["queryPlanner"]["winningPlan"]))
+        self.assertEqual(
+            stages,
+            [("FETCH", None), ("OR", None), ("IXSCAN", "breed_1_animal_type_1"), ("IXSCAN", "color_1")],
+        )
+
+    def test_explain_query_reports_indexes(self):
+        db = _ExplainDatabase(INDEXED_EXPLAIN)
+        plan = index_advisor.explain_query(db, "dogs", {"color": "Black"})
+
+        self.assertEqual(plan["stages"], ["FETCH", "OR", "IXSCAN", "IXSCAN"])
+        self.assertEqual(plan["indexes"], ["breed_1_animal_type_1", "color_1"])
+        self.assertFalse(plan["collscan"])
+        self.assertIsNone(db.cursor.sorted_by)
+
+    def test_explain_query_reports_collection_scan(self):
+        db = _ExplainDatabase(COLLSCAN_EXPLAIN)
+        plan = index_advisor.explain_query(db, "dogs", {"status": "Available"}, {"name": 1})
+
+        self.assertEqual(plan["stages"], ["SORT", "COLLSCAN"])
+        self.assertEqual(plan["indexes"], [])
+        self.assertTrue(plan["collscan"])
+        self.assertEqual(db.cursor.sorted_by, [("name", 1)])
+
+    def test_redundant_indexes(self):
+        info = {
+            "_id_": {"key": [("_id", 1)]},
+            "animal_id_1": {"key": [("animal_id", 1)], "unique": True},
+            "animal_id_1_name_1": {"key": [("animal_id", 1), ("name", 1)]},
+            "breed_1": {"key": [("breed", 1)]},
+            "breed_1_animal_type_1": {"key": [("breed", 1), ("animal_type", 1)]},
+            "animal_type_1_breed_1": {"key": [("animal_type", 1), ("breed", 1)]},
+            "color_1": {"key": [("color", 1)]},
+        }
+        self.assertEqual(index_advisor.redundant_indexes(info), [("breed_1", "breed_1_animal_type_1")])
+
+    def test_suggest_index_uses_top_level_fields(self):
+        filter = {"status": "Available", "breed": {"$in": [ObjectId()]}, "$or": [{"color": "Black"}]}
+        self.assertEqual(index_advisor.suggest_index(filter), [("status", 1), ("breed", 1)])
+
+class ResponseCacheTests(SimpleTestCase):
+    def entry(self, size):
+        return {"identity": b"x" * size}
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = response_cache.ResponseCache(max_bytes=100, max_entries=10)
+        cache.get_or_build("a", lambda: self.entry(40))
+        cache.get_or_build("b", lambda: self.entry(40))
+        cache.get_or_build("a", lambda: self.fail("a should be cached"))
+        cache.get_or_build("c", lambda: self.entry(40))
+
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.size, 80)
+
+    def test_evicts_least_recently_used_by_entries(self):
+        cache = response_cache.ResponseCache(max_bytes=1000, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.get_or_build(key, lambda: self.entry(10))
+
+        self.assertEqual(list(cache.entries), ["b", "c"])
+        self.assertEqual(cache.size, 20)
+
+    def test_skips_entries_larger_than_the_cache(self):
+        cache = response_cache.ResponseCache(max_bytes=100, max_entries=10)
+        cache.get_or_build("a", lambda: self.entry(10))
+        entry = cache.get_or_build("big", lambda: self.entry(200))
+
+        self.assertEqual(len(entry["identity"]), 200)
+        self.assertEqual(list(cache.entries), ["a"])
+
+    def run_concurrent_misses(self, cache, build, followers=5):
+        """Start followers + 1 threads missing on the same key; return their outcomes."""
+        outcomes = []
+
+        def fetch():
+            try:
+                outcomes.append(cache.get_or_build("key", build))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=fetch) for _ in range(followers + 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return outcomes
+
+    def test_concurrent_misses_build_once(self):
+        cache = response_cache.ResponseCache(max_bytes=1000, max_entries=10)
+        builds = []
+
+        def build():
+            builds.append(1)
+            # Hold the flight open until every thread has missed
+            wait_until(lambda: cache.misses == 6)
+            return self.entry(10)
+
+        outcomes = self.run_concurrent_misses(cache, build)
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len(outcomes), 6)
+        self.assertTrue(all(outcome is outcomes[0] for outcome in outcomes))
+
+    def test_build_error_reaches_followers(self):
+        cache = response_cache.ResponseCache(max_bytes=1000, max_entries=10)
+        builds = []
+
+        def build():
+            builds.append(1)
+            wait_until(lambda: cache.misses == 6)
+            raise ValueError("build failed")
+
+        outcomes = self.run_concurrent_misses(cache, build)
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len(outcomes), 6)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+        self.assertEqual(cache.flights, {})
+        self.assertEqual(cache.entries, {})
+
+    def test_normalize_params_ignores_order_and_blanks(self):
+        names = ["breed", "color", "sex"]
+        a = response_cache.normalize_params(QueryDict("breed=Lab&color=Black"), names)
+        b = response_cache.normalize_params(QueryDict("color=Black&breed=Lab&sex="), names)
+        c = response_cache.normalize_params(QueryDict("color=Black&breed=Lab&page=2"), names)
+
+        self.assertEqual(a, (("breed", "Lab"), ("color", "Black")))
+        self.assertEqual(a, b)
+        self.assertEqual(a, c)
+
+    def test_normalize_params_matches_the_query(self):
+        # Repeated params use the last value, like QueryDict.get(), so the
+        # order matters; whitespace is part of the value.
+        a = response_cache.normalize_params(QueryDict("breed=Pug&breed=Lab"), ["breed"])
+        b = response_cache.normalize_params(QueryDict("breed=Lab&breed=Pug"), ["breed"])
+        c = response_cache.normalize_params(QueryDict("color=Black%20"), ["color"])
+
+        self.assertEqual(a, (("breed", "Lab"),))
+        self.assertEqual(b, (("breed", "Pug"),))
+        self.assertEqual(c, (("color", "Black "),))
+
+    def test_choose_encoding(self):
+        available = {"identity", "gzip", "br"}
+        self.assertEqual(response_cache.choose_encoding("gzip, deflate, br", available), "br")
+        self.assertEqual(response_cache.choose_encoding("GZIP;q=1.0", available), "gzip")
+        self.assertEqual(response_cache.choose_encoding("br", {"identity", "gzip"}), "identity")
+        self.assertEqual(response_cache.choose_encoding("", available), "identity")
+
+    def test_choose_encoding_respects_q_zero(self):
+        available = {"identity", "gzip", "br"}
+        self.assertEqual(response_cache.choose_encoding("gzip;q=0", available), "identity")
+        self.assertEqual(response_cache.choose_encoding("br;q=0, gzip;q=0.5", available), "gzip")
+        self.assertEqual(response_cache.choose_encoding("br; q=0.0, gzip; q=0", available), "identity")
+        self.assertEqual(response_cache.choose_encoding("*", available), "br")
+        self.assertEqual(response_cache.choose_encoding("*, br;q=0", available), "gzip")
+        self.assertEqual(response_cache.choose_encoding("*;q=0", available), "identity")
+
+    @override_settings(
+        DOG_LIST_CACHE={},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_off_by_default_without_warning(self):
+        self.assertFalse(response_cache.is_enabled())
+        self.assertEqual(checks.check_dog_list_cache(None), [])
+
+    @override_settings(
+        DOG_LIST_CACHE={"ENABLED": True},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_disabled_with_process_local_versions(self):
+        self.assertFalse(response_cache.is_enabled())
+        self.assertEqual([w.id for w in checks.check_dog_list_cache(None)], ["api.W001"])
+
+    @override_settings(
+        DOG_LIST_CACHE={"ENABLED": True, "ALLOW_PROCESS_LOCAL": True},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_process_local_versions_opt_in(self):
+        self.assertTrue(response_cache.is_enabled())
+        self.assertEqual(checks.check_dog_list_cache(None), [])
+
+    @override_settings(
+        DOG_LIST_CACHE={"ENABLED": True},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}},
+    )
+    def test_enabled_with_shared_versions(self):
+        self.assertTrue(response_cache.is_enabled())
+        self.assertEqual(checks.check_dog_list_cache(None), [])
+
+
+class FakeCollection:
+    """Records bulk_write() batches instead of writing them. The first `failures` calls raise `error`."""
+
+    def __init__(self, failures=0, error=PyMongoError("write failed")):
+        self.batches = []
+        self.failures = failures
+        self.error = error
+
+    def bulk_write(self, operations, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        self.batches.append(list(operations))
+
+
+def set_op(animal_id, **fields):
+    return UpdateOne({"animal_id": animal_id}, {"$set": fields})
+
+
+class DogWriteQueueTests(SimpleTestCase):
+    def make_queue(self, collection=None, **kwargs):
+        self.collection = collection or FakeCollection()
+        return write_queue.DogWriteQueue(get_collection=lambda: self.collection, **kwargs)
+
+    def test_coalesces_patches_per_dog(self):
+        queue = self.make_queue()
+        queue.enqueue("A1", {"name": "Zed", "color": "Black"})
+        queue.enqueue("A2", {"name": "Rex"})
+        queue.enqueue("A1", {"name": "Frank"})
+
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(
+            self.collection.batches,
+            [[set_op("A1", name="Frank", color="Black"), set_op("A2", name="Rex")]],
+        )
+        self.assertEqual(queue.flush(), 0)
+
+    def test_flushes_in_max_batch_chunks(self):
+        queue = self.make_queue(max_batch=2)
+        for animal_id in ("A1", "A2", "A3"):
+            queue.enqueue(animal_id, {"name": animal_id})
+        queue.flush()
+
+        self.assertEqual([len(batch) for batch in self.collection.batches], [2, 1])
+
+    def test_full_batch_flushes_before_the_window(self):
+        queue = self.make_queue(window=60, max_batch=2)
+        queue.start()
+        self.addCleanup(queue.close)
+        queue.enqueue("A1", {"name": "Rex"})
+        queue.enqueue("A2", {"name": "Max"})
+
+        self.assertTrue(wait_until(lambda: self.collection.batches))
+        self.assertEqual(self.collection.batches, [[set_op("A1", name="Rex"), set_op("A2", name="Max")]])
+
+    def test_close_flushes_and_rejects_new_updates(self):
+        flushed = []
+        queue = self.make_queue(window=60, on_flush=lambda: flushed.append(1))
+        queue.start()
+        queue.enqueue("A1", {"name": "Rex"})
+        queue.close()
+
+        self.assertFalse(queue.thread.is_alive())
+        self.assertEqual(self.collection.batches, [[set_op("A1", name="Rex")]])
+        self.assertEqual(flushed, [1])
+        with self.assertRaises(RuntimeError):
+            queue.enqueue("A1", {"name": "Max"})
+
+    def test_close_retries_a_failed_flush(self):
+        queue = self.make_queue(FakeCollection(failures=1), window=60)
+        queue.start()
+        queue.enqueue("A1", {"name": "Rex"})
+        queue.close()
+
+        self.assertEqual(self.collection.batches, [[set_op("A1", name="Rex")]])
+        metrics = queue.metrics()
+        self.assertEqual((metrics["queue_depth"], metrics["retries"], metrics["dropped"]), (0, 1, 0))
+
+    def test_close_counts_what_it_cannot_write(self):
+        queue = self.make_queue(FakeCollection(failures=10), max_retries=2)
+        queue.enqueue("A1", {"name": "Rex"})
+        queue.enqueue("A2", {"name": "Max"})
+        queue.close()
+
+        self.assertEqual(self.collection.batches, [])
+        metrics = queue.metrics()
+        self.assertEqual((metrics["queue_depth"], metrics["errors"], metrics["dropped"]), (0, 3, 2))
+
+    def test_metrics(self):
+        queue = self.make_queue()
+        queue.enqueue("A1", {"name": "Zed"})
+        queue.enqueue("A1", {"name": "Frank"})
+        queue.enqueue("A2", {"name": "Rex"})
+        self.assertEqual(queue.metrics()["queue_depth"], 2)
+        queue.flush()
+
+        metrics = queue.metrics()
+        self.assertEqual(
+            {key: metrics[key] for key in ("queue_depth", "enqueued", "coalesced", "flushed_updates", "flushes", "errors")},
+            {"queue_depth": 0, "enqueued": 3, "coalesced": 1, "flushed_updates": 2, "flushes": 1, "errors": 0},
+        )
+        self.assertGreaterEqual(metrics["max_flush_ms"], metrics["avg_flush_ms"])
+
+    def test_failed_batch_is_requeued_under_newer_patches(self):
+        flushed = []
+        queue = self.make_queue(FakeCollection(failures=1), on_flush=lambda: flushed.append(1))
+        queue.enqueue("A1", {"name": "Zed", "color": "Black"})
+
+        self.assertEqual(queue.flush(), 0)
+        self.assertEqual(flushed, [])
+        queue.enqueue("A1", {"name": "Frank"})
+        self.assertEqual(queue.flush(), 1)
+
+        self.assertEqual(self.collection.batches, [[set_op("A1", name="Frank", color="Black")]])
+        self.assertEqual(flushed, [1])
+        metrics = queue.metrics()
+        self.assertEqual((metrics["errors"], metrics["retries"], metrics["dropped"]), (1, 1, 0))
+        self.assertEqual(queue.failures, {})
+
+    def test_drops_patch_after_max_retries(self):
+        queue = self.make_queue(FakeCollection(failures=10, error=TypeError("bad document")), max_retries=2)
+        queue.enqueue("A1", {"name": "Rex"})
+        for _ in range(3):
+            queue.flush()
+
+        metrics = queue.metrics()
+        self.assertEqual(metrics["queue_depth"], 0)
+        self.assertEqual((metrics["errors"], metrics["retries"], metrics["dropped"]), (3, 2, 1))
+        self.assertEqual(queue.flush(), 0)
+
+    def test_thread_survives_unexpected_errors(self):
+        calls = []
+
+        def on_flush():
+            calls.append(1)
+            if len(calls) == 1:
+                raise TypeError("unexpected")
+
+        queue = self.make_queue(window=0.001, on_flush=on_flush)
+        queue.start()
+        self.addCleanup(queue.close)
+        queue.enqueue("A1", {"name": "Rex"})
+        self.assertTrue(wait_until(lambda: calls))
+        queue.enqueue("A2", {"name": "Max"})
+
+        self.assertTrue(wait_until(lambda: len(calls) == 2))
+        self.assertTrue(queue.thread.is_alive())
+        self.assertEqual(queue.metrics()["errors"], 1)
+
+    def test_update_back_to_stored_value_is_not_lost(self):
+        # The dog is stored as "Frank". Renaming it to "Zed" and straight back
+        # must leave it as "Frank" once the queue is flushed.
+        queue = self.make_queue()
+        queue.enqueue("A1", update_fields({"name": "Zed"}))
+        queue.enqueue("A1", update_fields({"name": "Frank"}))
+        queue.flush()
+
+        self.assertEqual(self.collection.batches, [[UpdateOne({"animal_id": "A1"}, {"$set": {"name": "Frank"}})]])
+
+
+@unittest.skipIf(mongomock is None, "mongomock is not installed")
+class MongomockTestCase(SimpleTestCase):
+    """Runs against an in-memory mongomock database seeded with `rows` dogs from the CSV."""
+
+    rows = 200
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        mongoengine.disconnect()
+        mongoengine.connect(settings.MONGO_DB, host="mongodb://localhost", mongo_client_class=mongomock.MongoClient)
+        cls.seeded = seed_dogs(limit=cls.rows)
+
+    @classmethod
+    def tearDownClass(cls):
+        mongoengine.disconnect()
+        register_mongo_connection()
+        super().tearDownClass()
+
+
+class ExportQueryTests(MongomockTestCase):
+    def test_string_filters(self):
+        query = export.build_query({"sex": "Neutered Male", "color": "Black", "outcome_type": ""})
+        self.assertEqual(query, {"sex_upon_outcome": "Neutered Male", "color": "Black"})
+        self.assertEqual(export.build_query({}), {})
+
+    def test_reference_filters_use_ids(self):
+        breed = Breed.objects.get(name="Pit Bull Mix")
+        rescue = RescueType.objects.first()
+        query = export.build_query({"breed": "Pit Bull Mix", "rescue_type": rescue.name})
+        self.assertEqual(query, {"breed": {"$in": [breed.id]}, "rescue_type": {"$in": [rescue.id]}})
+
+    def test_unknown_breed_matches_nothing(self):
+        query = export.build_query({"breed": "Not A Breed"})
+        self.assertEqual(query, {"breed": {"$in": []}})
+        self.assertEqual(list(export.iter_dog_rows({"breed": "Not A Breed"})), [])
+
+
+class ExportFormatTests(MongomockTestCase):
+    def test_csv_matches_the_source_layout(self):
+        output = "".join(export.stream_export("csv", batch_size=50))
+        with open(CSV_PATH, encoding="utf-8") as file:
+            header = next(csv.reader(file))
+        source_rows = defaultdict(list)
+        for row in iter_csv_dogs():
+            source_rows[row["animal_id"]].append(row)
+
+        reader = csv.DictReader(io.StringIO(output))
+        rows = list(reader)
+        self.assertEqual(reader.fieldnames, header)
+        self.assertEqual(len(rows), self.seeded)
+        for row in rows:
+            self.assertIn(row, source_rows[row["animal_id"]])
+
+    def test_filters_apply_to_the_export(self):
+        rows = list(csv.DictReader(io.StringIO("".join(export.stream_export("csv", {"breed": "Pit Bull Mix"})))))
+        self.assertTrue(rows)
+        self.assertEqual({row["breed"] for row in rows}, {"Pit Bull Mix"})
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_writes_one_row_group_per_batch(self):
+        data = b"".join(export.stream_export("parquet", batch_size=60))
+        parquet = pyarrow.parquet.ParquetFile(io.BytesIO(data))
+
+        self.assertEqual(parquet.metadata.num_rows, self.seeded)
+        self.assertEqual(parquet.metadata.num_row_groups, -(-self.seeded // 60))
+        self.assertEqual(parquet.schema_arrow.names, export.EXPORT_COLUMNS)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow_writes_one_record_batch_per_batch(self):
+        data = b"".join(export.stream_export("arrow", batch_size=60))
+        batches = list(pyarrow.ipc.open_stream(data))
+
+        sizes = [batch.num_rows for batch in batches]
+        self.assertEqual(sum(sizes), self.seeded)
+        self.assertEqual(len(sizes), -(-self.seeded // 60))
+        self.assertTrue(all(size == 60 for size in sizes[:-1]))
+        self.assertEqual(batches[0].schema.names, export.EXPORT_COLUMNS)
+
+
+class ExportViewTests(MongomockTestCase):
+    rows = 20
+
+    def assertBadRequest(self, query):
+        response = self.client.get(f"/api/dogs/export/?{query}")
+        self.assertEqual(response.status_code, 400, query)
+        self.assertIn("error", response.json())
+
+    def test_rejects_bad_parameters(self):
+        for query in ("export_format=xml", "batch_size=abc", "batch_size=0", "format=parquet", "format=csv"):
+            with self.subTest(query=query):
+                self.assertBadRequest(query)
+
+    def test_streams_csv_whatever_the_accept_header(self):
+        response = self.client.get("/api/dogs/export/?export_format=csv&batch_size=5", HTTP_ACCEPT="text/csv")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="dogs.csv"')
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], ",".join(export.EXPORT_COLUMNS))
+        self.assertEqual(len(lines), self.seeded + 1)
+
+
+class LoadTestPercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+
+    def test_small_samples(self):
+        self.assertEqual(percentile(list(range(1, 21)), 95), 19)
+        self.assertEqual(percentile(list(range(1, 21)), 50), 10)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([], 99), 0.0)
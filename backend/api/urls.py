@@ -2,13 +2,16 @@
 from django.urls import path
 from .views.rescue_views import RescueTypeListView
 from .views.breed_views import BreedListView
-from .views.dogs_views import DogListView
+from .views.dogs_views import DogListView, DogWriteQueueView
+from .views.export_views import DogExportView
 
 urlpatterns = [
     path("breeds/", BreedListView.as_view(), name="breed-list"),
     path("breeds/<str:breed_id>/", BreedListView.as_view(), name="breed-detail"),
     path("rescue-types/", RescueTypeListView.as_view(), name="rescue-type-list"),
     path("rescue-types/<str:rescue_id>/", RescueTypeListView.as_view(), name="rescue-type-detail"),
+    path('dogs/export/', DogExportView.as_view(), name='dog-export'),
+    path('dogs/write-queue/', DogWriteQueueView.as_view(), name='dog-write-queue'),
     path('dogs/', DogListView.as_view(), name='dog-list'),
     path('dogs/<str:dog_id>/', DogListView.as_view(), name='dog-detail'),
 ]
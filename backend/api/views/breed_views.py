@@ -1,6 +1,7 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from api.models import Breed
+from api import response_cache
 from api.serializers import BreedSerializer
 
 # --- BREEDS ---
@@ -21,6 +22,7 @@ class BreedListView(APIView):
         
         breed = Breed(name=name)
         breed.save()
+        response_cache.bump_version("breeds")
         return Response({"message": "Breed added", "id": str(breed.id)}, status=201)
 
     def put(self, request, breed_id=None):
@@ -43,6 +45,7 @@ class BreedListView(APIView):
             breed = Breed.objects.get(id=breed_id)
             breed.name = new_name
             breed.save()
+            response_cache.bump_version("breeds")
             return Response({"message": "Breed updated", "id": str(breed.id), "name": breed.name})
         except Breed.DoesNotExist:
             return Response({"error": "Breed not found"}, status=404)
@@ -58,6 +61,7 @@ class BreedListView(APIView):
         try:
             breed = Breed.objects.get(id=breed_id)
             breed.delete()
+            response_cache.bump_version("breeds")
             return Response({"message": "Breed deleted"})
         except Breed.DoesNotExist:
             return Response({"error": "Breed not found"}, status=404)
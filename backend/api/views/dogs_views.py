@@ -1,8 +1,70 @@
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
+from mongoengine import ValidationError
 from api.models import Dog
+from api.export import FILTER_PARAMS, build_query
+from api import response_cache, write_queue
 from bson import ObjectId
 
+# The dog list embeds breed and rescue type names, so it depends on all three
+DOG_LIST_COLLECTIONS = ["dogs", "breeds", "rescues"]
+
+# Fields PUT /api/dogs/<id>/ is allowed to change
+UPDATEABLE_FIELDS = ['name', 'color', 'age_upon_outcome_in_weeks', 'sex_upon_outcome', 'date_of_birth']
+
+
+def dog_to_dict(dog):
+    return {
+        "_id": str(dog.id),
+        "animal_id": dog.animal_id,
+        "animal_type": dog.animal_type,
+        "breed": dog.breed.name if dog.breed else None,
+        "color": dog.color,
+        "date_of_birth": dog.date_of_birth,
+        "datetime": dog.datetime,
+        "name": dog.name,
+        "outcome_subtype": dog.outcome_subtype,
+        "outcome_type": dog.outcome_type,
+        "sex_upon_outcome": dog.sex_upon_outcome,
+        "location_lat": dog.location_lat,
+        "location_long": dog.location_long,
+        "age_upon_outcome_in_weeks": dog.age_upon_outcome_in_weeks,
+        "rescue_type": dog.rescue_type.name if dog.rescue_type else None,
+        "age": dog.age,
+        "weight": dog.weight,
+        "description": dog.description,
+        "status": dog.status
+    }
+
+
+def update_fields(data):
+    """Validated {db field: value} for the updateable fields in `data`.
+
+    Every field sent is returned, even if it matches the stored value: an
+    earlier update to the same dog may still be queued, and skipping a field
+    that "didn't change" would let that older value win when it is flushed.
+    """
+    fields = {}
+    for name in UPDATEABLE_FIELDS:
+        if name not in data:
+            continue
+        field = Dog._fields[name]
+        value = field.to_python(data[name])
+        if value is not None:
+            field.validate(value)
+        fields[field.db_field] = value
+    return fields
+
+
+def list_dogs(filters):
+    dogs = Dog.objects(__raw__=build_query(filters))
+    dogs_data = [dog_to_dict(dog) for dog in dogs]
+    print(f"dogs count: {len(dogs_data)}")
+    return dogs_data
+
+
 class DogListView(APIView):
     def get(self, request, dog_id=None):
         if dog_id:
@@ -17,57 +79,30 @@ class DogListView(APIView):
                 except (Dog.DoesNotExist, ValueError):
                     return Response({"error": "Dog not found"}, status=404)
             
-            dog_dict = {
-                "_id": str(dog.id),
-                "animal_id": dog.animal_id,
-                "animal_type": dog.animal_type,
-                "breed": dog.breed.name if dog.breed else None,
-                "color": dog.color,
-                "date_of_birth": dog.date_of_birth,
-                "datetime": dog.datetime,
-                "name": dog.name,
-                "outcome_subtype": dog.outcome_subtype,
-                "outcome_type": dog.outcome_type,
-                "sex_upon_outcome": dog.sex_upon_outcome,
-                "location_lat": dog.location_lat,
-                "location_long": dog.location_long,
-                "age_upon_outcome_in_weeks": dog.age_upon_outcome_in_weeks,
-                "rescue_type": dog.rescue_type.name if dog.rescue_type else None,
-                "age": dog.age,
-                "weight": dog.weight,
-                "description": dog.description,
-                "status": dog.status
-            }
-            return Response(dog_dict)
-        else:
-            # Get all dogs
-            dogs = Dog.objects.all()
-            dogs_data = []
-            for dog in dogs:
-                dog_dict = {
-                    "_id": str(dog.id),
-                    "animal_id": dog.animal_id,
-                    "animal_type": dog.animal_type,
-                    "breed": dog.breed.name if dog.breed else None,
-                    "color": dog.color,
-                    "date_of_birth": dog.date_of_birth,
-                    "datetime": dog.datetime,
-                    "name": dog.name,
-                    "outcome_subtype": dog.outcome_subtype,
-                    "outcome_type": dog.outcome_type,
-                    "sex_upon_outcome": dog.sex_upon_outcome,
-                    "location_lat": dog.location_lat,
-                    "location_long": dog.location_long,
-                    "age_upon_outcome_in_weeks": dog.age_upon_outcome_in_weeks,
-                    "rescue_type": dog.rescue_type.name if dog.rescue_type else None,
-                    "age": dog.age,
-                    "weight": dog.weight,
-                    "description": dog.description,
-                    "status": dog.status
-                }
-                dogs_data.append(dog_dict)
-            print(f"dogs count: {len(dogs_data)}")
-            return Response(dogs_data)
+            return Response(dog_to_dict(dog))
+
+        # The cache key and the query are both built from these params
+        params = response_cache.normalize_params(request.query_params, FILTER_PARAMS)
+        if not response_cache.is_enabled() or request.accepted_renderer.format != "json":
+            return Response(list_dogs(dict(params)))
+        config = response_cache.get_cache_settings()
+
+        # Serve pre-rendered (and pre-compressed) bytes for repeated list queries.
+        # The key includes the collection versions bumped by the write handlers.
+        versions = tuple(response_cache.get_version(name) for name in DOG_LIST_COLLECTIONS)
+        entry = response_cache.get_response_cache().get_or_build(
+            ("dog-list", params, versions),
+            lambda: response_cache.compress(
+                JSONRenderer().render(list_dogs(dict(params))), config["COMPRESSION"]
+            ),
+        )
+
+        encoding = response_cache.choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), entry)
+        response = HttpResponse(entry[encoding], content_type="application/json")
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+        response["Vary"] = "Accept-Encoding"
+        return response
 
     def post(self, request):
         # Validate required fields manually
@@ -105,6 +140,7 @@ class DogListView(APIView):
         # Create new dog using MongoEngine model
         dog = Dog(**dog_data)
         dog.save()
+        response_cache.bump_version("dogs")
         
         return Response({"message": "Dog added", "id": str(dog.id)}, status=201)
 
@@ -113,24 +149,40 @@ class DogListView(APIView):
             return Response({"error": "Dog ID is required"}, status=400)
 
         data = request.data
-        
+        write_behind = write_queue.is_enabled()
+        # Write-behind only needs the dog's ids to queue the patch
+        dogs = Dog.objects.only("id", "animal_id") if write_behind else Dog.objects
+
         # Try to find dog by animal_id first, then by MongoDB ObjectId
         try:
-            dog = Dog.objects.get(animal_id=dog_id)
+            dog = dogs.get(animal_id=dog_id)
         except Dog.DoesNotExist:
             try:
-                dog = Dog.objects.get(id=ObjectId(dog_id))
+                dog = dogs.get(id=ObjectId(dog_id))
             except (Dog.DoesNotExist, ValueError):
                 return Response({"error": "Dog not found"}, status=404)
 
+        if write_behind:
+            try:
+                fields = update_fields(data)
+            except ValidationError as e:
+                return Response({"error": str(e)}, status=400)
+            if fields:
+                write_queue.get_write_queue().enqueue(dog.animal_id, fields)
+            return Response({
+                "message": "Dog update queued",
+                "id": str(dog.id),
+                "animal_id": dog.animal_id,
+                "fields": sorted(fields),
+            }, status=202)
+
         # Update only the fields that are provided in the request
-        updateable_fields = ['name', 'color', 'age_upon_outcome_in_weeks', 'sex_upon_outcome', 'date_of_birth']
-        
-        for field in updateable_fields:
+        for field in UPDATEABLE_FIELDS:
             if field in data:
                 setattr(dog, field, data[field])
         
         dog.save()
+        response_cache.bump_version("dogs")
         
         return Response({
             "message": "Dog updated successfully",
@@ -152,4 +204,12 @@ class DogListView(APIView):
                 return Response({"error": "Dog not found"}, status=404)
 
         dog.delete()
+        response_cache.bump_version("dogs")
         return Response({"message": "Dog deleted successfully"})
+
+
+class DogWriteQueueView(APIView):
+    def get(self, request):
+        if not write_queue.is_enabled():
+            return Response({"enabled": False})
+        return Response({"enabled": True, **write_queue.get_write_queue().metrics()})
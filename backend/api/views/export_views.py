@@ -0,0 +1,59 @@
+from django.http import StreamingHttpResponse
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from api.export import EXPORT_FORMATS, DEFAULT_BATCH_SIZE, FILTER_PARAMS, stream_export
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+class IgnoreAcceptNegotiation(BaseContentNegotiation):
+    """Always pick the first renderer, whatever the Accept header says.
+
+    The export's type comes from export_format, so clients sending
+    Accept: text/csv (or */*) must not get a 406 from DRF.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class DogExportView(APIView):
+    # Only used for error responses; the export itself is a StreamingHttpResponse
+    renderer_classes = [JSONRenderer]
+    content_negotiation_class = IgnoreAcceptNegotiation
+
+    def get(self, request):
+        # "format" is reserved by DRF for renderer selection, so use export_format.
+        # The negotiation above ignores it, so don't let ?format=parquet quietly return CSV.
+        if "format" in request.query_params and "export_format" not in request.query_params:
+            return Response({"error": "Use export_format to choose the export format"}, status=400)
+        export_format = request.query_params.get("export_format", "csv").lower()
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": f"export_format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+        try:
+            batch_size = int(request.query_params.get("batch_size", DEFAULT_BATCH_SIZE))
+        except ValueError:
+            return Response({"error": "batch_size must be an integer"}, status=400)
+        if batch_size <= 0:
+            return Response({"error": "batch_size must be positive"}, status=400)
+
+        filters = {key: request.query_params.get(key) for key in FILTER_PARAMS if request.query_params.get(key)}
+
+        try:
+            chunks = stream_export(export_format, filters, batch_size=batch_size)
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=501)
+
+        response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+        response["Content-Disposition"] = f'attachment; filename="dogs.{export_format}"'
+        return response
@@ -1,6 +1,7 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from api.models import RescueType
+from api import response_cache
 from api.serializers import  RescueTypeSerializer
 
 class RescueTypeListView(APIView):
@@ -20,6 +21,7 @@ class RescueTypeListView(APIView):
         
         rescue_type = RescueType(name=name)
         rescue_type.save()
+        response_cache.bump_version("rescues")
         return Response({"message": "Rescue type added", "id": str(rescue_type.id)}, status=201)
 
     def put(self, request, rescue_id=None):
@@ -42,6 +44,7 @@ class RescueTypeListView(APIView):
             rescue_type = RescueType.objects.get(id=rescue_id)
             rescue_type.name = new_name
             rescue_type.save()
+            response_cache.bump_version("rescues")
             return Response({"message": "Rescue type updated", "id": str(rescue_type.id), "name": rescue_type.name})
         except RescueType.DoesNotExist:
             return Response({"error": "Rescue type not found"}, status=404)
@@ -57,6 +60,7 @@ class RescueTypeListView(APIView):
         try:
             rescue_type = RescueType.objects.get(id=rescue_id)
             rescue_type.delete()
+            response_cache.bump_version("rescues")
             return Response({"message": "Rescue type deleted"})
         except RescueType.DoesNotExist:
             return Response({"error": "Rescue type not found"}, status=404)
@@ -0,0 +1,219 @@
+# api/write_queue.py
+#
+# Optional write-behind mode for dog updates. PUT /api/dogs/<id>/ turns the
+# request into a $set patch of the fields it sends and queues it.
+# Patches for the same animal_id are merged until the next flush, and a
+# background thread writes the queue as unordered bulk_write batches every
+# WINDOW_MS. A batch that fails to write is queued again, under any newer
+# patch for the same dog, and dropped once it has been retried MAX_RETRIES
+# times. The queue is flushed on interpreter shutdown, with the same retries.
+#
+# Reads may return the old values for up to one window after a queued update.
+
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from pymongo import UpdateOne
+from api.models import Dog
+from api import response_cache
+
+DEFAULT_SETTINGS = {
+    "ENABLED": False,
+    "WINDOW_MS": 50,
+    "MAX_BATCH": 500,
+    "MAX_RETRIES": 3,
+}
+
+
+def get_queue_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, "DOG_WRITE_BEHIND", {})}
+
+
+def is_enabled():
+    return get_queue_settings()["ENABLED"]
+
+
+class DogWriteQueue:
+    """Coalesces $set patches per animal_id and flushes them from a background thread."""
+
+    def __init__(self, window=0.05, max_batch=500, max_retries=3, get_collection=None, on_flush=None):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.get_collection = get_collection or Dog._get_collection
+        self.on_flush = on_flush
+        self.pending = OrderedDict()
+        # animal_id -> number of failed flushes of its current patch
+        self.failures = {}
+        self.lock = threading.Lock()
+        # Only one flush at a time, so a shutdown flush can't interleave with the thread's
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.thread = None
+
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushed_updates = 0
+        self.flushes = 0
+        self.errors = 0
+        self.retries = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="dog-write-queue", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, animal_id, fields):
+        """Queue a $set of `fields` (db field name -> value) for the dog with `animal_id`."""
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Dog write queue is closed")
+            patch = self.pending.get(animal_id)
+            if patch is None:
+                self.pending[animal_id] = dict(fields)
+            else:
+                # Later values win, so the dog ends up as if the updates ran in order
+                patch.update(fields)
+                self.coalesced += 1
+            self.enqueued += 1
+            depth = len(self.pending)
+        if depth >= self.max_batch:
+            self.wakeup.set()
+
+    def _run(self):
+        while not self.closed:
+            self.wakeup.wait(self.window)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the thread alive, otherwise nothing is written until shutdown
+                with self.lock:
+                    self.errors += 1
+                print(f"Error in dog write queue: {e}")
+
+    def flush(self):
+        """Write every pending patch now. Returns the number of dogs written."""
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return 0
+                batch = self.pending
+                self.pending = OrderedDict()
+
+            items = list(batch.items())
+            start = time.perf_counter()
+            succeeded = []
+            failed = []
+            failed_chunks = 0
+            for i in range(0, len(items), self.max_batch):
+                chunk = items[i:i + self.max_batch]
+                try:
+                    operations = [UpdateOne({"animal_id": animal_id}, {"$set": fields}) for animal_id, fields in chunk]
+                    self.get_collection().bulk_write(operations, ordered=False)
+                    succeeded.extend(chunk)
+                except Exception as e:
+                    failed.extend(chunk)
+                    failed_chunks += 1
+                    print(f"Error flushing dog updates: {e}")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            written = len(succeeded)
+
+            with self.lock:
+                for animal_id, _ in succeeded:
+                    self.failures.pop(animal_id, None)
+                self.errors += failed_chunks
+                self._requeue(failed)
+                self.flushes += 1
+                self.flushed_updates += written
+                self.last_flush_ms = elapsed_ms
+                self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+                self.total_flush_ms += elapsed_ms
+
+        if written and self.on_flush:
+            self.on_flush()
+        return written
+
+    def _requeue(self, failed):
+        """Put failed patches back in the queue. Call with self.lock held."""
+        for animal_id, fields in failed:
+            failures = self.failures.get(animal_id, 0) + 1
+            if failures > self.max_retries:
+                self.failures.pop(animal_id, None)
+                self.dropped += 1
+                print(f"Dropping update for dog {animal_id} after {self.max_retries} retries: {fields}")
+                continue
+            self.failures[animal_id] = failures
+            # Anything queued since the flush started is newer and wins
+            patch = dict(fields)
+            patch.update(self.pending.get(animal_id, {}))
+            self.pending[animal_id] = patch
+            self.retries += 1
+
+    def close(self, timeout=5):
+        """Stop accepting updates, stop the thread and flush whatever is left.
+
+        Failed writes are retried up to max_retries times; anything still
+        queued after that is logged and counted as dropped.
+        """
+        with self.lock:
+            self.closed = True
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        for _ in range(self.max_retries + 1):
+            self.flush()
+            with self.lock:
+                if not self.pending:
+                    return
+        with self.lock:
+            for animal_id, fields in self.pending.items():
+                print(f"Dropping update for dog {animal_id} at shutdown: {fields}")
+            self.dropped += len(self.pending)
+            self.pending = OrderedDict()
+            self.failures.clear()
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "queue_depth": len(self.pending),
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "flushed_updates": self.flushed_updates,
+                "flushes": self.flushes,
+                "errors": self.errors,
+                "retries": self.retries,
+                "dropped": self.dropped,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            }
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                config = get_queue_settings()
+                queue = DogWriteQueue(
+                    window=config["WINDOW_MS"] / 1000,
+                    max_batch=config["MAX_BATCH"],
+                    max_retries=config["MAX_RETRIES"],
+                    # Cached dog lists only go stale once the patches reach Mongo
+                    on_flush=lambda: response_cache.bump_version("dogs"),
+                )
+                queue.start()
+                atexit.register(queue.close)
+                _queue = queue
+    return _queue
@@ -13,8 +13,6 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
-# MongoEngine Configuration
-import mongoengine
 
 load_dotenv()
 
@@ -145,14 +143,29 @@ MONGO_DB = os.getenv("MONGO_DB", "AAC")
 MONGO_USERNAME = os.getenv("MONGO_USERNAME", "")
 MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
 
-# Connect to MongoDB
-if MONGO_USERNAME and MONGO_PASSWORD:
-    mongoengine.connect(
-        db=MONGO_DB,
-        host=f"mongodb://{MONGO_USERNAME}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}/?authSource=AAC"
-    )
-else:
-    mongoengine.connect(
-        db=MONGO_DB,
-        host=f"mongodb://{MONGO_HOST}:{MONGO_PORT}"
-    )
+# The MongoEngine connection is registered lazily in api.apps.ApiConfig.ready()
+# and only opened on first query. Indexes are created with
+# `python manage.py ensure_indexes`.
+
+# Response cache for GET /api/dogs/ (see api/response_cache.py).
+# COMPRESSION lists encodings to pre-compress; "br" needs the brotli package.
+# Off by default. Invalidation goes through CACHES["default"], so once ENABLED
+# the cache only serves responses with a shared backend such as Redis.
+# ALLOW_PROCESS_LOCAL allows the default LocMemCache, which is only correct
+# with a single worker process.
+DOG_LIST_CACHE = {
+    "ENABLED": os.getenv("DOG_LIST_CACHE_ENABLED", "False") == "True",
+    "ALLOW_PROCESS_LOCAL": os.getenv("DOG_LIST_CACHE_ALLOW_PROCESS_LOCAL", "False") == "True",
+    "MAX_BYTES": 64 * 1024 * 1024,
+    "MAX_ENTRIES": 256,
+    "COMPRESSION": ["gzip", "br"],
+}
+
+# Write-behind mode for PUT /api/dogs/<id>/ (see api/write_queue.py). Updates
+# are coalesced per animal_id and flushed with bulk_write every WINDOW_MS.
+DOG_WRITE_BEHIND = {
+    "ENABLED": os.getenv("DOG_WRITE_BEHIND_ENABLED", "False") == "True",
+    "WINDOW_MS": 50,
+    "MAX_BATCH": 500,
+    "MAX_RETRIES": 3,
+}
@@ -0,0 +1,446 @@
+"""
+Concurrent load test replaying the frontend's traffic against the Django API.
+
+Each virtual user loops over a session modelled on frontend/src/services/api.js:
+
+- page load: GET /api/dogs/, /api/breeds/ and /api/rescue-types/
+- with probability --write-ratio, one action from ManageDataModal / MainPage:
+  edit a dog, delete a dog, or add/rename/delete a breed or rescue type,
+  followed by the list refetch the frontend does after a write
+
+Results are reported per endpoint (throughput, p50/p95/p99 latency, errors)
+for each concurrency level, followed by a summary that shows where
+throughput stops scaling.
+
+Deletes are permanent, so the database is dropped and re-seeded before each
+level; otherwise later levels would run against fewer dogs and a smaller
+GET /api/dogs/ payload. Against --url the harness can only do that with
+--reseed; without it, deleting dogs is left out of the traffic mix.
+
+Targets:
+
+- default: an in-process threaded WSGI server backed by mongomock (a
+  stand-in Mongo, `pip install mongomock`) seeded from the CSV. Good for
+  relative comparisons and checking the harness; it shares the GIL with the
+  load generator, so absolute numbers are pessimistic.
+- --mongo real: the same in-process server on a scratch database
+  (<MONGO_DB>_loadtest) of the configured MongoDB.
+- --url: an already running server, e.g. one gunicorn configuration per run.
+  Seed its database first with --seed-only, and pass --reseed to re-seed
+  it before every level:
+
+    python benchmarks/load_test.py --seed-only --scale 5
+    MONGO_DB=AAC_loadtest gunicorn backend.wsgi -w 4 --threads 2
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --reseed --scale 5 --concurrency 1,4,16,32
+
+Usage (from the backend/ directory):
+
+    python benchmarks/load_test.py --concurrency 1,2,4,8 --duration 20
+"""
+
+import argparse
+import contextlib
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+
+# --- Statistics ---
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, latency, status):
+        with self.lock:
+            self.latencies[endpoint].append(latency)
+            self.statuses[endpoint][status] += 1
+            if status == "error" or status >= 400:
+                self.errors[endpoint] += 1
+
+    def rows(self, elapsed):
+        rows = []
+        for endpoint in sorted(self.latencies):
+            latencies = sorted(self.latencies[endpoint])
+            count = len(latencies)
+            rows.append({
+                "endpoint": endpoint,
+                "requests": count,
+                "rps": count / elapsed,
+                "errors": self.errors[endpoint],
+                "error_rate": self.errors[endpoint] / count,
+                "p50": percentile(latencies, 50) * 1000,
+                "p95": percentile(latencies, 95) * 1000,
+                "p99": percentile(latencies, 99) * 1000,
+                "max": latencies[-1] * 1000,
+                "statuses": dict(self.statuses[endpoint]),
+            })
+        return rows
+
+    def totals(self, elapsed):
+        latencies = sorted(t for values in self.latencies.values() for t in values)
+        errors = sum(self.errors.values())
+        count = len(latencies)
+        return {
+            "requests": count,
+            "rps": count / elapsed,
+            "error_rate": errors / count if count else 0.0,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+        }
+
+
+# --- HTTP client ---
+
+class ApiClient:
+    """One keep-alive connection per virtual user."""
+
+    def __init__(self, base_url, stats, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, endpoint, body=None):
+        """Send one request, record it under `endpoint` and return (status, parsed JSON or None)."""
+        headers = {"Accept": "application/json", "Accept-Encoding": "identity"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            self.stats.record(endpoint, time.perf_counter() - start, "error")
+            return None, None
+        self.stats.record(endpoint, time.perf_counter() - start, status)
+
+        if response.will_close:
+            self.close()
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+# --- Traffic mix ---
+
+class DogPool:
+    """animal_ids available for edits and deletes, shared by all virtual users."""
+
+    def __init__(self, animal_ids):
+        self.lock = threading.Lock()
+        self.ids = list(animal_ids)
+        random.shuffle(self.ids)
+
+    def pick(self):
+        with self.lock:
+            return random.choice(self.ids) if self.ids else None
+
+    def take(self):
+        with self.lock:
+            return self.ids.pop() if self.ids else None
+
+
+def page_load(client):
+    client.request("GET", "/api/dogs/", "GET /api/dogs/")
+    client.request("GET", "/api/breeds/", "GET /api/breeds/")
+    client.request("GET", "/api/rescue-types/", "GET /api/rescue-types/")
+
+
+def edit_dog(client, pool):
+    animal_id = pool.pick()
+    if animal_id is None:
+        return
+    client.request("PUT", f"/api/dogs/{animal_id}/", "PUT /api/dogs/{id}/", {
+        "name": f"Load {random.randint(1, 9999)}",
+        "color": random.choice(["Black", "Brown/White", "Tan"]),
+        "sex_upon_outcome": random.choice(["Neutered Male", "Spayed Female"]),
+    })
+    client.request("GET", "/api/dogs/", "GET /api/dogs/")
+
+
+def delete_dog(client, pool):
+    animal_id = pool.take()
+    if animal_id is None:
+        return
+    client.request("DELETE", f"/api/dogs/{animal_id}/", "DELETE /api/dogs/{id}/")
+    client.request("GET", "/api/dogs/", "GET /api/dogs/")
+
+
+def manage_breeds(client, pool):
+    manage_lookup(client, "breeds")
+
+
+def manage_rescue_types(client, pool):
+    manage_lookup(client, "rescue-types")
+
+
+def manage_lookup(client, path):
+    """Add, rename and delete a breed or rescue type like ManageDataModal does."""
+    name = f"Load test {uuid.uuid4().hex[:8]}"
+    status, data = client.request("POST", f"/api/{path}/", f"POST /api/{path}/", {"name": name})
+    client.request("GET", f"/api/{path}/", f"GET /api/{path}/")
+    if status != 201 or not data:
+        return
+    item_id = data["id"]
+    client.request("PUT", f"/api/{path}/{item_id}/", f"PUT /api/{path}/{{id}}/", {"name": name + " renamed"})
+    client.request("DELETE", f"/api/{path}/{item_id}/", f"DELETE /api/{path}/{{id}}/")
+    client.request("GET", f"/api/{path}/", f"GET /api/{path}/")
+
+
+# Relative weights of the write actions
+WRITE_ACTIONS = [
+    (4, edit_dog),
+    (1, delete_dog),
+    (2, manage_breeds),
+    (2, manage_rescue_types),
+]
+
+
+def virtual_user(base_url, stats, pool, deadline, write_ratio, think_time, timeout, write_actions):
+    client = ApiClient(base_url, stats, timeout)
+    weights = [weight for weight, _ in write_actions]
+    actions = [action for _, action in write_actions]
+    try:
+        while time.perf_counter() < deadline:
+            page_load(client)
+            if random.random() < write_ratio:
+                random.choices(actions, weights)[0](client, pool)
+            if think_time:
+                time.sleep(random.uniform(0, 2 * think_time))
+    finally:
+        client.close()
+
+
+def run_level(base_url, concurrency, duration, pool, write_ratio, think_time, timeout, write_actions=WRITE_ACTIONS):
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=virtual_user,
+            args=(base_url, stats, pool, deadline, write_ratio, think_time, timeout, write_actions),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - start
+
+
+# --- Reporting ---
+
+def print_level(concurrency, stats, elapsed, out):
+    print(f"\n== concurrency {concurrency} ({elapsed:.1f}s) ==", file=out)
+    print(f"{'endpoint':<30} {'reqs':>7} {'req/s':>8} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}", file=out)
+    for row in stats.rows(elapsed):
+        print(
+            f"{row['endpoint']:<30} {row['requests']:>7} {row['rps']:>8.1f} {row['error_rate'] * 100:>6.1f}"
+            f" {row['p50']:>8.1f} {row['p95']:>8.1f} {row['p99']:>8.1f} {row['max']:>8.1f}",
+            file=out,
+        )
+
+
+def print_summary(results, out):
+    print("\n== summary ==", file=out)
+    print(f"{'concurrency':>11} {'req/s':>8} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}", file=out)
+    for concurrency, totals in results:
+        print(
+            f"{concurrency:>11} {totals['rps']:>8.1f} {totals['error_rate'] * 100:>6.1f}"
+            f" {totals['p50']:>8.1f} {totals['p95']:>8.1f} {totals['p99']:>8.1f}",
+            file=out,
+        )
+
+    # Saturation: the first level where adding users no longer adds 10% throughput
+    for (prev_c, prev), (c, totals) in zip(results, results[1:]):
+        if totals["rps"] < prev["rps"] * 1.10:
+            print(f"\nThroughput stops scaling at ~{prev_c} concurrent users ({prev['rps']:.1f} req/s);"
+                  f" at {c} users p95 is {totals['p95']:.1f} ms vs {prev['p95']:.1f} ms", file=out)
+            return
+    if len(results) > 1:
+        print("\nThroughput was still scaling at the highest concurrency tested", file=out)
+
+
+# --- Target setup ---
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def connect_database(mongo):
+    """Point the app at the scratch database. Returns the pymongo Database."""
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from api import index_advisor
+
+    db_name = f"{settings.MONGO_DB}_loadtest"
+    kwargs = {}
+    if mongo == "mock":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("--mongo mock needs mongomock (pip install mongomock), or use --mongo real / --url")
+        kwargs["mongo_client_class"] = mongomock.MongoClient
+
+    return index_advisor.connect(db_name, **kwargs)
+
+
+def seed_database(db, scale, rows):
+    """Drop and re-seed the scratch database, so every level starts from the same data."""
+    from api import index_advisor, response_cache
+    from api.seed import seed_dogs
+    from api.views.dogs_views import DOG_LIST_COLLECTIONS
+
+    db.client.drop_database(db.name)
+    for model in index_advisor.MODELS:
+        model.ensure_indexes()
+    seeded = seed_dogs(limit=rows, scale=scale)
+    # Cached dog lists from the previous level describe the old data
+    for collection in DOG_LIST_COLLECTIONS:
+        response_cache.bump_version(collection)
+    print(f"Seeded {seeded} dogs into {db.name}", file=sys.stderr)
+
+
+def start_server():
+    from django.core.wsgi import get_wsgi_application
+
+    server = make_server("127.0.0.1", 0, get_wsgi_application(),
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def fetch_animal_ids(base_url, timeout):
+    client = ApiClient(base_url, Stats(), timeout)
+    status, dogs = client.request("GET", "/api/dogs/", "warmup")
+    client.close()
+    if status != 200:
+        sys.exit(f"GET {base_url}/api/dogs/ returned {status}")
+    return [dog["animal_id"] for dog in dogs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: start one in-process)")
+    parser.add_argument("--mongo", choices=["mock", "real"], default="mock",
+                        help="Database for the in-process server or --seed-only (default: mongomock)")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the CSV dogs this many times when seeding")
+    parser.add_argument("--rows", type=int, help="Cap the number of seeded dogs")
+    parser.add_argument("--seed-only", action="store_true",
+                        help="Seed <MONGO_DB>_loadtest on the configured MongoDB and exit")
+    parser.add_argument("--reseed", action="store_true",
+                        help="With --url, re-seed <MONGO_DB>_loadtest on the configured MongoDB before each level")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels to run")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per concurrency level")
+    parser.add_argument("--write-ratio", type=float, default=0.2,
+                        help="Probability that a session performs a write action after the page load")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between sessions, in seconds")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    out = sys.stdout
+
+    if args.seed_only:
+        seed_database(connect_database("real"), args.scale, args.rows)
+        return
+
+    server = None
+    db = None
+    write_actions = WRITE_ACTIONS
+    # The views print to stdout on every request; keep the report readable
+    quiet = contextlib.redirect_stdout(open(os.devnull, "w")) if not args.url else contextlib.nullcontext()
+    with quiet:
+        if args.url:
+            base_url = args.url
+            if args.reseed:
+                db = connect_database("real")
+            else:
+                # Nothing can restore deleted dogs between levels
+                write_actions = [(weight, action) for weight, action in WRITE_ACTIONS if action is not delete_dog]
+                print("Not deleting dogs: pass --reseed to restore the data between levels", file=sys.stderr)
+        else:
+            db = connect_database(args.mongo)
+            server, base_url = start_server()
+
+        try:
+            results = []
+            report = []
+            for concurrency in levels:
+                if db is not None:
+                    seed_database(db, args.scale, args.rows)
+                pool = DogPool(fetch_animal_ids(base_url, args.timeout))
+                print(f"Running {concurrency} concurrent users for {args.duration:.0f}s against {len(pool.ids)} dogs"
+                      f" on {base_url}...", file=sys.stderr)
+                stats, elapsed = run_level(base_url, concurrency, args.duration, pool,
+                                           args.write_ratio, args.think_time, args.timeout, write_actions)
+                print_level(concurrency, stats, elapsed, out)
+                totals = stats.totals(elapsed)
+                results.append((concurrency, totals))
+                report.append({"concurrency": concurrency, "totals": totals, "endpoints": stats.rows(elapsed)})
+            print_summary(results, out)
+        finally:
+            if server is not None:
+                server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
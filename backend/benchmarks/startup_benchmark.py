@@ -0,0 +1,124 @@
+"""
+Import-time / cold start benchmark for the Django backend.
+
+Each run starts a fresh interpreter, so module caches don't hide the cost.
+Two modes are measured:
+
+- lazy:  the current startup, django.setup() with the connection only
+         registered in ApiConfig.ready()
+- eager: what the old settings.py did, an import-time mongoengine.connect()
+         before django.setup(), with indexes created on the first query
+
+"startup" is the time until django.setup() returns, which is what every
+manage.py command and test run pays. With --first-query the time of the
+first Dog query is reported too; that needs a reachable MongoDB, and in eager
+mode it includes the index creation the old code did on first use.
+
+Usage (from the backend/ directory):
+
+    python benchmarks/startup_benchmark.py --runs 10
+    python benchmarks/startup_benchmark.py --runs 10 --first-query
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = """
+import os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+"""
+
+LAZY_SCRIPT = SETUP + """
+import django
+django.setup()
+startup = time.perf_counter() - start
+"""
+
+# Mirrors the connect block the old backend/settings.py ran at import time
+EAGER_SCRIPT = SETUP + """
+import mongoengine
+from dotenv import load_dotenv
+load_dotenv()
+MONGO_HOST = os.getenv("MONGO_HOST", "localhost")
+MONGO_PORT = int(os.getenv("MONGO_PORT", 27017))
+MONGO_DB = os.getenv("MONGO_DB", "AAC")
+MONGO_USERNAME = os.getenv("MONGO_USERNAME", "")
+MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
+if MONGO_USERNAME and MONGO_PASSWORD:
+    mongoengine.connect(db=MONGO_DB, host=f"mongodb://{{MONGO_USERNAME}}:{{MONGO_PASSWORD}}@{{MONGO_HOST}}:{{MONGO_PORT}}/?authSource=AAC")
+else:
+    mongoengine.connect(db=MONGO_DB, host=f"mongodb://{{MONGO_HOST}}:{{MONGO_PORT}}")
+import django
+django.setup()
+from api.models import Dog, Breed, RescueType
+for model in (Dog, Breed, RescueType):
+    # The old models built their indexes on first collection access
+    model._meta["auto_create_index"] = True
+startup = time.perf_counter() - start
+"""
+
+FIRST_QUERY = """
+from api.models import Dog
+query_start = time.perf_counter()
+Dog.objects.first()
+print(startup, time.perf_counter() - query_start)
+"""
+
+NO_QUERY = """
+print(startup, "nan")
+"""
+
+
+def time_startup(script, runs):
+    startups = []
+    first_queries = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr)
+        startup, first_query = result.stdout.strip().splitlines()[-1].split()
+        startups.append(float(startup))
+        first_queries.append(float(first_query))
+    return startups, first_queries
+
+
+def summarize(timings):
+    timings_ms = [t * 1000 for t in timings]
+    return (
+        f"median {statistics.median(timings_ms):8.1f} ms"
+        f"   min {min(timings_ms):8.1f} ms   max {max(timings_ms):8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=["lazy", "eager", "both"], default="both")
+    parser.add_argument("--first-query", action="store_true", help="Also time the first Dog query (needs MongoDB)")
+    args = parser.parse_args()
+
+    tail = FIRST_QUERY if args.first_query else NO_QUERY
+    scripts = {"lazy": LAZY_SCRIPT + tail, "eager": EAGER_SCRIPT + tail}
+    modes = ["lazy", "eager"] if args.mode == "both" else [args.mode]
+
+    for mode in modes:
+        startups, first_queries = time_startup(scripts[mode].format(backend_dir=BACKEND_DIR), args.runs)
+        print(f"{mode:>5} startup:     {summarize(startups)}   ({args.runs} runs)")
+        if args.first_query:
+            print(f"{mode:>5} first query: {summarize(first_queries)}")
+
+
+if __name__ == "__main__":
+    main()
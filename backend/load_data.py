@@ -2,7 +2,6 @@ import csv
 import os
 import sys
 import django
-from api.models import Dog, Breed, RescueType
 
 # Add the backend directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -11,9 +10,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
+from django.core.management import call_command
+from api.models import Dog, Breed, RescueType
+
 
 def load_data():
     csv_file_path = '../aac_shelter_outcomes.csv'
+
+    # Models don't build indexes on first query, so create them up front and
+    # have the unique animal_id index in place before loading
+    call_command('ensure_indexes')
     
     # Create or get breeds and rescue types
     breeds_cache = {}
@@ -1,13 +1,16 @@
 import os
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, OperationFailure
+import copy
+from collections import OrderedDict
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import ConnectionFailure, OperationFailure, BulkWriteError
+from bson import json_util
 from bson.objectid import ObjectId
 from dotenv import load_dotenv
 
 class AnimalShelter(object):
     """ CRUD operations for Animal collection in MongoDB """
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, cache_size=0):
         # Load environment variables from the .env file
         load_dotenv()
         HOST = os.getenv("MONGO_HOST")
@@ -15,6 +18,13 @@ class AnimalShelter(object):
         DB = os.getenv("MONGO_DB")
         COL = os.getenv("MONGO_COL")
 
+        # Optional LRU cache of read() results, keyed by normalized query.
+        # Disabled when cache_size is 0. Only writes made through this instance
+        # clear it; changes by other clients or other AnimalShelter instances
+        # aren't seen until clear_cache() is called.
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
         try:
             self.client = MongoClient(f'mongodb://{username}:{password}@{HOST}:{PORT}/?authSource={DB}')
             self.database = self.client[DB]
@@ -24,10 +34,27 @@ class AnimalShelter(object):
         except OperationFailure as e:
             print(f"Authentication failed: {e}")
 
+    def _prepare_query(self, query):
+        query = dict(query or {})
+        if "_id" in query and isinstance(query["_id"], str):
+            query["_id"] = ObjectId(query["_id"])
+        return query
+
+    def _cache_key(self, query, projection=None):
+        # Sorting the top-level fields makes {"a": 1, "b": 2} and {"b": 2, "a": 1}
+        # share an entry. Nested documents keep their order, since MongoDB
+        # matches embedded documents field by field in order. json_util keeps
+        # BSON types distinct, so a datetime and its string form don't collide.
+        return json_util.dumps([sorted(query.items()), projection])
+
+    def clear_cache(self):
+        self._cache.clear()
+
     def create(self, data):
         if data:
             try:
                 self.collection.insert_one(data)
+                self.clear_cache()
                 return True
             except Exception as e:
                 print(f"Error inserting document: {e}")
@@ -35,20 +62,126 @@ class AnimalShelter(object):
         else:
             raise ValueError("No data provided for insertion")
 
+    def create_many(self, documents, batch_size=1000):
+        """Insert documents in unordered batches. Returns the number inserted.
+
+        `documents` can be any iterable; raises ValueError if it is empty.
+        """
+        inserted = 0
+        seen = 0
+        batch = []
+        for document in documents:
+            seen += 1
+            batch.append(document)
+            if len(batch) >= batch_size:
+                inserted += self._insert_batch(batch)
+                batch = []
+        if batch:
+            inserted += self._insert_batch(batch)
+        if not seen:
+            raise ValueError("No data provided for insertion")
+        self.clear_cache()
+        return inserted
+
+    def _insert_batch(self, batch):
+        try:
+            return len(self.collection.insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            print(f"Error inserting documents: {e.details.get('writeErrors', [])[:1]}")
+            return e.details.get("nInserted", 0)
+        except Exception as e:
+            print(f"Error inserting documents: {e}")
+            return 0
+
+    def bulk_upsert(self, documents, key="animal_id", batch_size=1000):
+        """Insert or update documents matched on `key`. Returns (upserted, modified).
+
+        `documents` can be any iterable; raises ValueError if it is empty.
+        """
+        upserted = 0
+        modified = 0
+        seen = 0
+        operations = []
+        for document in documents:
+            seen += 1
+            if key not in document:
+                raise ValueError(f"Document is missing upsert key '{key}'")
+            operations.append(UpdateOne({key: document[key]}, {"$set": document}, upsert=True))
+            if len(operations) >= batch_size:
+                counts = self._write_batch(operations)
+                upserted += counts[0]
+                modified += counts[1]
+                operations = []
+        if operations:
+            counts = self._write_batch(operations)
+            upserted += counts[0]
+            modified += counts[1]
+        if not seen:
+            raise ValueError("No data provided for upsert")
+        self.clear_cache()
+        return upserted, modified
+
+    def _write_batch(self, operations):
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            return result.upserted_count, result.modified_count
+        except BulkWriteError as e:
+            print(f"Error upserting documents: {e.details.get('writeErrors', [])[:1]}")
+            return e.details.get("nUpserted", 0), e.details.get("nModified", 0)
+        except Exception as e:
+            print(f"Error upserting documents: {e}")
+            return 0, 0
+
     def read(self, query):
         try:
-            if "_id" in query and isinstance(query["_id"], str):
-                query["_id"] = ObjectId(query["_id"])
-            return list(self.collection.find(query))
+            query = self._prepare_query(query)
+            if not self.cache_size:
+                return list(self.collection.find(query))
+
+            key = self._cache_key(query)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                # Callers get their own copies so mutating a result can't corrupt the cache
+                return copy.deepcopy(self._cache[key])
+
+            results = list(self.collection.find(query))
+            self._cache[key] = results
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return copy.deepcopy(results)
         except Exception as e:
             print(f"Error reading documents: {e}")
             return []
-        
+
+    def iter_read(self, query, projection=None, batch_size=1000):
+        """Yield matching documents one at a time from a batched cursor.
+
+        Unlike read(), results are never materialized as a list, so large
+        result sets can be processed in constant memory.
+        """
+        try:
+            cursor = self.collection.find(self._prepare_query(query), projection, batch_size=batch_size)
+        except Exception as e:
+            print(f"Error reading documents: {e}")
+            return
+        try:
+            for document in cursor:
+                yield document
+        finally:
+            cursor.close()
+
+    def count(self, query):
+        try:
+            return self.collection.count_documents(self._prepare_query(query))
+        except Exception as e:
+            print(f"Error counting documents: {e}")
+            return 0
+
     def update(self, query, new_values):
         try:
-            if "_id" in query and isinstance(query["_id"], str):
-                query["_id"] = ObjectId(query["_id"])
+            query = self._prepare_query(query)
             result = self.collection.update_many(query, new_values)
+            self.clear_cache()
             return result.modified_count
         except Exception as e:
             print(f"Error updating documents: {e}")
@@ -56,9 +189,9 @@ class AnimalShelter(object):
 
     def delete(self, query):
         try:
-            if "_id" in query and isinstance(query["_id"], str):
-                query["_id"] = ObjectId(query["_id"])
+            query = self._prepare_query(query)
             result = self.collection.delete_many(query)
+            self.clear_cache()
             return result.deleted_count
         except Exception as e:
             print(f"Error deleting documents: {e}")
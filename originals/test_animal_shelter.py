@@ -0,0 +1,186 @@
+"""
+Tests for animal_shelter.AnimalShelter against an in-memory mongomock server.
+
+Run from this directory:
+
+    python -m unittest test_animal_shelter
+"""
+
+import os
+import types
+import unittest
+from unittest import mock
+
+import animal_shelter
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+ENV = {"MONGO_HOST": "localhost", "MONGO_PORT": "27017", "MONGO_DB": "AAC", "MONGO_COL": "animals"}
+
+
+class BulkWriteCollection:
+    """Wraps a mongomock collection whose bulk_write() can't take pymongo 4 UpdateOne ops."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def bulk_write(self, operations, ordered=True):
+        upserted = modified = 0
+        for op in operations:
+            result = self._collection.update_one(op._filter, op._doc, upsert=op._upsert)
+            upserted += result.upserted_id is not None
+            modified += result.modified_count
+        return types.SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+
+@unittest.skipIf(mongomock is None, "mongomock is not installed")
+class AnimalShelterTestCase(unittest.TestCase):
+    cache_size = 0
+
+    def setUp(self):
+        patches = [
+            mock.patch.dict(os.environ, ENV),
+            mock.patch.object(animal_shelter, "MongoClient", mongomock.MongoClient),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.shelter = animal_shelter.AnimalShelter("user", "password", cache_size=self.cache_size)
+        self.shelter.collection = BulkWriteCollection(self.shelter.collection)
+
+    def dogs(self, count, start=0):
+        return [{"animal_id": f"A{i}", "name": f"Dog {i}", "animal_type": "Dog"} for i in range(start, start + count)]
+
+
+class WriteTests(AnimalShelterTestCase):
+    def test_create_many_inserts_across_batches(self):
+        self.assertEqual(self.shelter.create_many(self.dogs(5), batch_size=2), 5)
+        self.assertEqual(self.shelter.count({}), 5)
+
+    def test_create_many_accepts_generators(self):
+        self.assertEqual(self.shelter.create_many(iter(self.dogs(3))), 3)
+        self.assertEqual(self.shelter.count({}), 3)
+
+    def test_create_many_skips_duplicates(self):
+        self.shelter.collection.create_index("animal_id", unique=True)
+        self.shelter.create_many(self.dogs(2))
+        self.assertEqual(self.shelter.create_many(self.dogs(4)), 2)
+        self.assertEqual(self.shelter.count({}), 4)
+
+    def test_empty_input_raises(self):
+        for documents in ([], iter([])):
+            with self.assertRaises(ValueError):
+                self.shelter.create_many(documents)
+            with self.assertRaises(ValueError):
+                self.shelter.bulk_upsert(documents)
+
+    def test_bulk_upsert_inserts_and_updates(self):
+        self.shelter.create_many(self.dogs(2))
+        documents = [{"animal_id": "A1", "name": "Rex"}, *self.dogs(2, start=2)]
+
+        self.assertEqual(self.shelter.bulk_upsert(documents, batch_size=2), (2, 1))
+        self.assertEqual(self.shelter.count({}), 4)
+        self.assertEqual(self.shelter.read({"animal_id": "A1"})[0]["name"], "Rex")
+
+    def test_bulk_upsert_requires_key(self):
+        with self.assertRaises(ValueError):
+            self.shelter.bulk_upsert([{"name": "Rex"}])
+
+
+class ReadTests(AnimalShelterTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shelter.create_many(self.dogs(5))
+
+    def test_iter_read_streams_with_projection(self):
+        rows = self.shelter.iter_read({"animal_type": "Dog"}, {"_id": 0, "name": 1}, batch_size=2)
+        self.assertIsInstance(rows, types.GeneratorType)
+        self.assertEqual([row for row in rows], [{"name": f"Dog {i}"} for i in range(5)])
+
+    def test_string_ids_are_converted(self):
+        document = self.shelter.read({"animal_id": "A3"})[0]
+        query = {"_id": str(document["_id"])}
+
+        self.assertEqual(self.shelter.count(query), 1)
+        self.assertEqual([row["animal_id"] for row in self.shelter.iter_read(query)], ["A3"])
+
+    def test_count(self):
+        self.assertEqual(self.shelter.count({}), 5)
+        self.assertEqual(self.shelter.count({"animal_id": {"$in": ["A1", "A2", "B1"]}}), 2)
+
+    def test_read_without_cache_sees_external_writes(self):
+        self.shelter.read({"animal_id": "A1"})
+        self.shelter.collection.update_one({"animal_id": "A1"}, {"$set": {"name": "Rex"}})
+        self.assertEqual(self.shelter.read({"animal_id": "A1"})[0]["name"], "Rex")
+        self.assertEqual(self.shelter._cache, {})
+
+
+class ReadCacheTests(AnimalShelterTestCase):
+    cache_size = 2
+
+    def setUp(self):
+        super().setUp()
+        self.shelter.create_many(self.dogs(5))
+
+    def rename_externally(self, animal_id, name):
+        # Bypasses the shelter, so its cache isn't cleared
+        self.shelter.collection.update_one({"animal_id": animal_id}, {"$set": {"name": name}})
+
+    def test_hit_ignores_key_order(self):
+        first = self.shelter.read({"animal_id": "A1", "animal_type": "Dog"})
+        self.rename_externally("A1", "Rex")
+        second = self.shelter.read({"animal_type": "Dog", "animal_id": "A1"})
+
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.shelter._cache), 1)
+
+    def test_nested_documents_keep_their_order(self):
+        self.shelter.read({"loc": {"a": 1, "b": 2}})
+        self.shelter.read({"loc": {"b": 2, "a": 1}})
+        self.assertEqual(len(self.shelter._cache), 2)
+
+    def test_results_are_copies(self):
+        self.shelter.read({"animal_id": "A1"})[0]["name"] = "Changed"
+        self.assertEqual(self.shelter.read({"animal_id": "A1"})[0]["name"], "Dog 1")
+
+    def test_evicts_least_recently_used(self):
+        self.shelter.read({"animal_id": "A1"})
+        self.shelter.read({"animal_id": "A2"})
+        self.shelter.read({"animal_id": "A1"})
+        self.shelter.read({"animal_id": "A3"})
+        for animal_id in ("A1", "A2", "A3"):
+            self.rename_externally(animal_id, "Rex")
+
+        self.assertEqual(self.shelter.read({"animal_id": "A1"})[0]["name"], "Dog 1")
+        self.assertEqual(self.shelter.read({"animal_id": "A2"})[0]["name"], "Rex")
+
+    def test_writes_through_the_shelter_clear_the_cache(self):
+        writes = [
+            lambda: self.shelter.create({"animal_id": "A9"}),
+            lambda: self.shelter.create_many(self.dogs(1, start=10)),
+            lambda: self.shelter.bulk_upsert([{"animal_id": "A4", "name": "Max"}]),
+            lambda: self.shelter.update({"animal_id": "A4"}, {"$set": {"name": "Max"}}),
+            lambda: self.shelter.delete({"animal_id": "A9"}),
+        ]
+        for write in writes:
+            self.shelter.read({"animal_id": "A1"})
+            write()
+            self.assertEqual(self.shelter._cache, {})
+
+    def test_clear_cache_picks_up_external_writes(self):
+        self.shelter.read({"animal_id": "A1"})
+        self.rename_externally("A1", "Rex")
+        self.assertEqual(self.shelter.read({"animal_id": "A1"})[0]["name"], "Dog 1")
+
+        self.shelter.clear_cache()
+        self.assertEqual(self.shelter.read({"animal_id": "A1"})[0]["name"], "Rex")
+
+
+if __name__ == "__main__":
+    unittest.main()